@@ -1,88 +1,26 @@
 from __future__ import annotations
 
 from pathlib import Path
-import json
 import re
 import os
-import urllib.request
-import urllib.error
 from typing import Iterable, List, Optional, Tuple
 
+from .description_cache import DescriptionCache, content_hash, file_hashes
+from .docs_index import DocsIndex, read_text_safe, tokenize
+from .ollama_client import DEFAULT_TIMEOUT, OllamaClient
 
-# Lightweight keywording to support fallback summarization
-_STOPWORDS = {
-    "a",
-    "an",
-    "and",
-    "are",
-    "as",
-    "at",
-    "be",
-    "but",
-    "by",
-    "for",
-    "if",
-    "in",
-    "into",
-    "is",
-    "it",
-    "no",
-    "not",
-    "of",
-    "on",
-    "or",
-    "such",
-    "that",
-    "the",
-    "their",
-    "then",
-    "there",
-    "these",
-    "they",
-    "this",
-    "to",
-    "was",
-    "with",
-    "you",
-    "your",
-    "we",
-    "our",
-}
-
-_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9_\-]+")
-
-
-def _tokenize(text: str) -> List[str]:
-    toks = [t.lower() for t in _WORD_RE.findall(text)]
-    return [t for t in toks if t not in _STOPWORDS and len(t) > 2]
-
-
-def _read_text_safe(p: Path) -> str:
-    try:
-        return p.read_text(encoding="utf-8")
-    except Exception:
-        try:
-            return p.read_text(errors="ignore")
-        except Exception:
-            return ""
-
-
-def _score_overlap(doc_text: str, ref_tokens: set[str]) -> int:
-    toks = set(_tokenize(doc_text))
-    return len(toks & ref_tokens)
-
+# Characters of docs sections included in the prompt
+DOCS_CONTEXT_CHARS = 3000
 
-def _doc_title_from_path(p: Path) -> str:
-    name = p.stem.replace("_", " ").replace("-", " ")
-    title = re.sub(r"\s+", " ", name).strip().title()
-    return title or p.stem
+# Best-ranked sections considered when packing the docs context
+_CANDIDATE_SECTIONS = 24
 
 
 def _collect_quiz_seed(files: Iterable[Path]) -> Tuple[str, List[str]]:
     texts: List[str] = []
     headings: List[str] = []
     for f in files:
-        t = _read_text_safe(Path(f))
+        t = read_text_safe(Path(f))
         texts.append(t)
         headings.extend(
             [m.group(1).strip() for m in re.finditer(r"^###\s+(.+)$", t, re.M)]
@@ -93,34 +31,27 @@ def _collect_quiz_seed(files: Iterable[Path]) -> Tuple[str, List[str]]:
 
 
 def _build_docs_context(
-    docs_root: Optional[Path], seed_tokens: List[str], *, char_budget: int = 12000
+    docs_root: Optional[Path],
+    seed_tokens: List[str],
+    *,
+    char_budget: int = DOCS_CONTEXT_CHARS,
+    index: Optional[DocsIndex] = None,
 ) -> Tuple[str, List[str]]:
-    if not docs_root or not docs_root.exists():
-        return "", []
-    ref = set(seed_tokens)
-    scored: List[Tuple[int, Path]] = []
-    for p in docs_root.rglob("*.rst"):
-        text = _read_text_safe(p)
-        if not text:
-            continue
-        s = _score_overlap(text, ref)
-        if s:
-            scored.append((s, p))
-    scored.sort(key=lambda x: x[0], reverse=True)
+    if index is None:
+        if not docs_root or not docs_root.exists():
+            return "", []
+        index = DocsIndex(docs_root)
     chosen: List[str] = []
     titles: List[str] = []
     remaining = char_budget
-    for _, p in scored[:8]:
-        text = _read_text_safe(p)
-        title = _doc_title_from_path(p)
-        snippet = text.strip()
-        if len(snippet) > 1500:
-            snippet = snippet[:1500]
-        block = f"\n\n# {title}\n{snippet}\n"
-        if remaining - len(block) < 0:
-            break
+    # Greedily pack the best sections; one that does not fit is skipped so a
+    # smaller one further down can still use the space
+    for section in index.search(seed_tokens, limit=_CANDIDATE_SECTIONS):
+        block = f"\n\n# {section.title}\n{section.text}\n"
+        if len(block) > remaining:
+            continue
         chosen.append(block)
-        titles.append(title)
+        titles.append(section.title)
         remaining -= len(block)
     return "".join(chosen), titles
 
@@ -130,39 +61,35 @@ def _ollama_generate(
     *,
     base_url: str = None,
     model: str = None,
-    timeout: int = 60,
+    timeout: Optional[float] = None,
+    client: Optional[OllamaClient] = None,
 ) -> Optional[str]:
     # Use environment variables if provided, otherwise use defaults
     base_url = base_url or os.environ.get("OLLAMA_URL", "http://localhost:11434")
     model = model or os.environ.get("OLLAMA_MODEL", "llama3.2")
 
-    url = base_url.rstrip("/") + "/api/generate"
-    # Optimized payload for better performance
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0.2,
-            "num_predict": 100  # Allow more tokens for complete descriptions
-        },
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url, data=data, headers={"Content-Type": "application/json"}, method="POST"
-    )
+    own_client = client is None
+    if client is None:
+        client = OllamaClient(
+            base_url, concurrency=1, timeout=timeout or DEFAULT_TIMEOUT
+        )
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            out = json.loads(resp.read().decode("utf-8"))
-            response = out.get("response", "").strip() or None
-            return response
-    except (
-        urllib.error.URLError,
-        urllib.error.HTTPError,
-        TimeoutError,
-        json.JSONDecodeError,
-    ) as e:
+        return client.generate(
+            prompt,
+            model=model,
+            # Optimized options for better performance
+            options={
+                "temperature": 0.2,
+                "num_predict": 100,  # Allow more tokens for complete descriptions
+            },
+            timeout=timeout,
+        )
+    except ValueError:
         return None
+    finally:
+        # A client made for this call alone would otherwise leak its socket
+        if own_client:
+            client.close()
 
 
 def _compose_prompt(
@@ -179,13 +106,17 @@ def _compose_prompt(
     # Use only the first 2000 chars of quiz seed
     truncated_seed = quiz_seed[:2000] if len(quiz_seed) > 2000 else quiz_seed
 
-    # Use only the first 3000 chars of docs
-    truncated_docs = docs_ctx[:3000] if len(docs_ctx) > 3000 else docs_ctx
+    # The docs context is already packed to its budget; this is a safeguard
+    truncated_docs = docs_ctx[:DOCS_CONTEXT_CHARS].strip()
+    docs_part = (
+        f"Related course material:\n{truncated_docs}\n\n" if truncated_docs else ""
+    )
 
     # Simplify the prompt structure
     return (
         f"Title: {title}\n\n"
         f"Quiz content highlights:\n{truncated_seed}\n\n"
+        f"{docs_part}"
         f"{instructions}\n\n"
         "Return only the description."
     )
@@ -197,23 +128,31 @@ def auto_generate_description(
     ollama_url: str = "http://localhost:11434",
     ollama_model: str = "llama3.2",
     max_chars: int = 500,  # Increased from 240 to allow fuller descriptions
+    cache: Optional[DescriptionCache] = None,
+    client: Optional[OllamaClient] = None,
+    docs_index: Optional[DocsIndex] = None,
 ) -> str:
     """Generate a quiz description using Ollama only.
 
-    Fails if Ollama is unavailable or returns no response.
+    Falls back to a plain description if Ollama is unavailable or returns no
+    response after its retries. With a cache, a description generated
+    earlier for the same prompt, model and quiz files is reused instead of
+    calling Ollama again. Pass a shared client to reuse its connections and
+    concurrency limit across quizzes, and a shared docs_index (of
+    docs_root) so the docs are not read again for every quiz.
     """
     # Count questions in files for inclusion in description
     question_count = 0
     for file in files:
-        text = _read_text_safe(file)
+        text = read_text_safe(file)
         # Count question markers (1., 2., etc.)
         question_matches = re.findall(r'^\d+\.\s+', text, re.MULTILINE)
         question_count += len(question_matches)
 
     # Generate description
     seed_text, _ = _collect_quiz_seed(files)
-    tokens = _tokenize(seed_text)
-    docs_ctx, _ = _build_docs_context(docs_root, tokens)
+    tokens = tokenize(seed_text)
+    docs_ctx, _ = _build_docs_context(docs_root, tokens, index=docs_index)
     prompt = _compose_prompt(
         title,
         seed_text,
@@ -222,18 +161,25 @@ def auto_generate_description(
         question_count=question_count
     )
 
-    # Attempt to generate description
-    ai = _ollama_generate(prompt, base_url=ollama_url, model=ollama_model)
+    key = None
+    sources: List[str] = []
+    if cache is not None:
+        sources = file_hashes(files)
+        key = cache.key(prompt, ollama_model, content_hash(sources))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    # Transient failures are retried with backoff by the client
+    ai = _ollama_generate(
+        prompt, base_url=ollama_url, model=ollama_model, client=client
+    )
     if ai:
         # Return the entire response without truncation, just clean it up
-        return ai.strip().replace("\n", " ")
-
-    # Try with a simplified prompt if the first attempt fails
-    simple_prompt = f"Write a description for a quiz titled '{title}' that contains {question_count} questions."
-    ai = _ollama_generate(simple_prompt, base_url=ollama_url, model=ollama_model, timeout=30)
-
-    if ai:
-        return ai.strip().replace("\n", " ")
+        description = ai.strip().replace("\n", " ")
+        if cache is not None and key is not None:
+            cache.put(key, description, model=ollama_model, sources=sources)
+        return description
 
     # If all else fails, return a simple description
     return f"Quiz on {title} containing {question_count} questions."
\ No newline at end of file
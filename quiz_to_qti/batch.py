@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import contextlib
 import re
-import shutil
-import subprocess
-import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence, Tuple
 
+from text2qti.err import Text2qtiError
+
+from .build_cache import CACHE_DIRNAME, BuildCache, build_key
 from .converter import convert_quizdown_files
+from .qti_writer import build_qti_zip, load_config
+from .text2qti_pool import Text2qtiPool
 
 
 @dataclass(slots=True)
@@ -93,38 +96,75 @@ def discover_quiz_groups(root: Path) -> List[QuizGroup]:
     return groups
 
 
-def build_groups(groups: Sequence[QuizGroup], out_dir: Path) -> List[Path]:
+def build_groups(
+    groups: Sequence[QuizGroup],
+    out_dir: Path,
+    engine: str = "builtin",
+    cache: Optional[BuildCache] = None,
+) -> List[Path]:
+    """Build one QTI zip per group.
+
+    The builtin engine writes the zips in-process; ``engine="text2qti"``
+    writes text2qti plaintext and converts it in a warm text2qti worker.
+    With a cache, groups whose build key is unchanged are restored from it
+    instead of rebuilt.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
     produced: List[Path] = []
-    t2qti = Path(sys.executable).with_name("text2qti")
-    found = shutil.which("text2qti") if not t2qti.exists() else str(t2qti)
-    if not t2qti.exists() and not found:
-        raise SystemExit("text2qti not found in PATH or venv; please install it.")
-    if not t2qti.exists() and found:
-        t2qti = Path(found)
-
-    for g in groups:
-        converted = convert_quizdown_files(
-            g.files,
-            title=g.title,
-            description=g.description,
-            shuffle_answers=True,
-            show_correct=True,
-        )
-        basename = _sanitize_basename(g.title)
-        txt_path = out_dir / f"{basename}.txt"
-        txt_path.write_text(converted.body, encoding="utf-8")
-
-        cmd = [str(t2qti), txt_path.name]
-        try:
-            subprocess.run(cmd, cwd=str(out_dir), check=True, text=True, input="\n")
-        except subprocess.CalledProcessError as e:
-            raise SystemExit(
-                f"text2qti failed for {txt_path.name} with exit code {e.returncode}"
-            ) from e
-
-        zip_path = out_dir / f"{basename}.zip"
-        if zip_path.exists():
+    # The build key covers the configuration with either engine
+    config = load_config()
+    with contextlib.ExitStack() as stack:
+        pool: Optional[Text2qtiPool] = None
+        for g in groups:
+            basename = _sanitize_basename(g.title)
+            zip_path = out_dir / f"{basename}.zip"
+            key = None
+            if cache is not None:
+                key = build_key(
+                    g.files,
+                    title=g.title,
+                    description=g.description,
+                    shuffle_answers=True,
+                    show_correct=True,
+                    engine=engine,
+                    config=config,
+                )
+                if cache.restore(key, zip_path) is not None:
+                    produced.append(zip_path)
+                    continue
+
+            if engine == "builtin":
+                build_qti_zip(
+                    g.files,
+                    zip_path,
+                    title=g.title,
+                    description=g.description,
+                    shuffle_answers=True,
+                    show_correct=True,
+                    config=config,
+                )
+            else:
+                if pool is None:
+                    # One warm worker imports text2qti once for the whole batch
+                    pool = stack.enter_context(Text2qtiPool(1))
+                txt_path = out_dir / f"{basename}.txt"
+                convert_quizdown_files(
+                    g.files,
+                    title=g.title,
+                    description=g.description,
+                    shuffle_answers=True,
+                    show_correct=True,
+                    out=txt_path,
+                )
+                try:
+                    zip_path = pool.convert(txt_path)
+                except Text2qtiError as e:
+                    raise SystemExit(
+                        f"text2qti failed for {txt_path.name}: {e}"
+                    ) from e
+
+            if cache is not None and key is not None:
+                cache.store(key, zip_path)
             produced.append(zip_path)
     return produced
 
@@ -147,10 +187,30 @@ def main() -> None:
         default=Path("_quiz_build"),
         help="Output directory for QTI zips",
     )
+    parser.add_argument(
+        "--engine",
+        choices=("builtin", "text2qti"),
+        default="builtin",
+        help="Build zips in-process (builtin) or via the text2qti command",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help=f"Build cache directory (default: OUT/{CACHE_DIRNAME})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild every quiz instead of restoring unchanged ones",
+    )
     args = parser.parse_args()
 
+    cache = None
+    if not args.no_cache:
+        cache = BuildCache(args.cache_dir or args.out / CACHE_DIRNAME)
     groups = discover_quiz_groups(args.root)
-    build_groups(groups, args.out)
+    build_groups(groups, args.out, engine=args.engine, cache=cache)
 
 
 if __name__ == "__main__":
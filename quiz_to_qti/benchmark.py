@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""Benchmark harness for the Quizdown to text2qti pipeline.
+
+Generates a large Quizdown question bank (many choices per question and
+multi-line feedback) and measures parse_quizdown, loading a QuestionBank,
+to_text2qti_plaintext, convert_quizdown_files and the ``batch`` command with
+both engines, run as from the command line with --no-cache. For the text2qti
+engine the worker pool is replaced by a stub so only this package's own work
+is timed; the builtin engine includes the Markdown rendering and zip
+writing. Results are compared with a stored baseline so performance work can
+be measured and regressions caught.
+
+Usage:
+
+    python -m quiz_to_qti.benchmark
+    python -m quiz_to_qti.benchmark --save-baseline
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+import click
+from click.testing import CliRunner
+
+from . import cli
+from .converter import (
+    QuestionBank,
+    convert_quizdown_files,
+    iter_quizdown,
+    parse_quizdown,
+    to_text2qti_plaintext,
+)
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+
+DEFAULT_THRESHOLD = 0.25  # Relative slowdown reported as a regression
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    """Throughput and memory of one benchmark."""
+
+    name: str
+    questions: int
+    bytes: int  # Markdown size processed per run
+    seconds: float  # Best wall time over the repeats
+    peak_memory: int  # Peak traced allocation during one run, in bytes
+
+    @property
+    def questions_per_second(self) -> float:
+        return self.questions / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1_048_576 / self.seconds if self.seconds else 0.0
+
+
+# Building blocks of the synthetic question bank, modeled on docs/quizzes
+_TOPICS = ["loops", "arrays", "functions", "variables", "servo", "sensors"]
+
+_WORDS = [
+    "pin",
+    "loop",
+    "array",
+    "value",
+    "servo",
+    "delay",
+    "index",
+    "sensor",
+    "function",
+    "variable",
+    "`digitalWrite`",
+    "`analogRead`",
+    "`for`",
+    "`while`",
+]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _question(rng: random.Random, index: int, max_choices: int) -> str:
+    lines = [f"### Question {index}: {_sentence(rng, rng.randint(6, 14))[:-1]}?"]
+    if index % 5 == 0:
+        lines += [
+            "```cpp",
+            f"for (int i = 0; i < {rng.randint(2, 50)}; i++) {{",
+            "    Serial.println(i);",
+            "}",
+            "```",
+        ]
+    for _ in range(rng.randint(1, 3)):
+        lines.append(f"> {_sentence(rng, rng.randint(5, 12))}")
+
+    # Every twentieth question has no choices and becomes an essay question
+    if index % 20 == 19:
+        return "\n".join(lines) + "\n"
+
+    choices = rng.randint(max(2, max_choices // 2), max_choices)
+    correct = set(rng.sample(range(choices), 2 if index % 4 == 0 else 1))
+    seen = set()
+    for choice in range(choices):
+        mark = "x" if choice in correct else " "
+        # Duplicate choices are rejected by the QTI writer, as by text2qti
+        text = _sentence(rng, rng.randint(2, 8))
+        while text in seen:
+            text = _sentence(rng, rng.randint(2, 8))
+        seen.add(text)
+        lines.append(f"1. [{mark}] {text}")
+        for _ in range(rng.choice((0, 1, 1, 2, 3))):
+            lines.append(f"    > {_sentence(rng, rng.randint(4, 10))}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_quizdown(questions: int, max_choices: int = 8, seed: int = 0) -> str:
+    """Return a deterministic Quizdown document with the given number of questions."""
+    rng = random.Random(seed)
+    return "\n".join(_question(rng, index, max_choices) for index in range(questions))
+
+
+def generate_quiz_tree(
+    root: Path, questions: int, files: int, max_choices: int = 8, seed: int = 0
+) -> List[Path]:
+    """Write the question bank as ``files`` quiz files spread over topic folders."""
+    paths: List[Path] = []
+    per_file = max(1, questions // files)
+    for number in range(files):
+        topic = root / _TOPICS[number % len(_TOPICS)]
+        topic.mkdir(parents=True, exist_ok=True)
+        path = topic / f"quiz_{number:03d}_quiz.md"
+        path.write_text(
+            generate_quizdown(per_file, max_choices, seed=seed + number),
+            encoding="utf-8",
+        )
+        paths.append(path)
+    return paths
+
+
+class _StubPool:
+    """Stand-in for Text2qtiPool that writes an empty zip for each job."""
+
+    def __init__(self, workers: int = 1, timeout: Optional[float] = None) -> None:
+        self.workers = workers
+
+    def __enter__(self) -> "_StubPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+    def convert(self, txt_path: Path) -> Path:
+        zip_path = txt_path.with_suffix(".zip")
+        with zipfile.ZipFile(zip_path, "w"):
+            pass
+        return zip_path
+
+    def close(self) -> None:
+        pass
+
+
+@contextlib.contextmanager
+def stub_text2qti() -> Iterator[None]:
+    """Replace the text2qti workers with an in-process stub.
+
+    The stub writes an empty zip next to the input, like text2qti would, so
+    the batch command sees a successful build.
+    """
+    with mock.patch.object(cli, "Text2qtiPool", _StubPool):
+        yield
+
+
+def run_batch(root: Path, out_dir: Path, engine: str) -> None:
+    """Run ``batch`` on root through click, without the build cache."""
+    result = CliRunner().invoke(
+        cli.batch_cmd,
+        [
+            "--root",
+            str(root),
+            "--out",
+            str(out_dir),
+            "--docs-root",
+            str(root),
+            "--engine",
+            engine,
+            "--no-cache",
+        ],
+        catch_exceptions=False,
+    )
+    if result.exit_code != 0:
+        raise RuntimeError(f"batch failed:\n{result.output}")
+
+
+def _measure(
+    name: str, questions: int, size: int, run: Callable[[], object], repeat: int
+) -> BenchmarkResult:
+    """Time a benchmark, then measure its peak memory in a separate run."""
+    # Warm-up: imports and compiled patterns
+    run()
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # tracemalloc slows everything down, so it never overlaps timed runs
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(name, questions, size, best, peak)
+
+
+def run_benchmarks(
+    questions: int, files: int, max_choices: int, repeat: int
+) -> List[BenchmarkResult]:
+    """Run every benchmark on a generated question bank."""
+    # The bank size is part of the name so baselines only compare like runs
+    suite = f"bank-{questions}q"
+    text = generate_quizdown(questions, max_choices)
+    size = len(text.encode("utf-8"))
+    parsed = parse_quizdown(text)
+    count = len(parsed)
+
+    def render() -> None:
+        quiz = to_text2qti_plaintext(
+            parsed,
+            title="Benchmark",
+            description="Generated question bank",
+            shuffle_answers=True,
+            show_correct=True,
+        )
+        with open(os.devnull, "w", encoding="utf-8") as sink:
+            quiz.write(sink)
+
+    lines = text.splitlines()
+    results = [
+        _measure(f"{suite}/parse", count, size, lambda: parse_quizdown(text), repeat),
+        _measure(
+            f"{suite}/bank",
+            count,
+            size,
+            lambda: QuestionBank(iter_quizdown(lines)),
+            repeat,
+        ),
+        _measure(f"{suite}/render", count, size, render, repeat),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "quizzes"
+        paths = generate_quiz_tree(root, questions, files, max_choices)
+        tree_size = sum(path.stat().st_size for path in paths)
+        tree_count = sum(
+            len(parse_quizdown(path.read_text(encoding="utf-8"))) for path in paths
+        )
+
+        results.append(
+            _measure(
+                f"{suite}/convert",
+                tree_count,
+                tree_size,
+                lambda: convert_quizdown_files(
+                    paths, title="Benchmark", out=Path(tmp) / "convert.txt"
+                ),
+                repeat,
+            )
+        )
+
+        out_dir = Path(tmp) / "build"
+        with stub_text2qti():
+            results.append(
+                _measure(
+                    f"{suite}/batch",
+                    tree_count,
+                    tree_size,
+                    lambda: run_batch(root, out_dir, "text2qti"),
+                    repeat,
+                )
+            )
+
+        # Markdown rendering makes the builtin engine far slower per question
+        # than the other steps, so it only builds the first tenth of the quizzes
+        qti_root = Path(tmp) / "qti_quizzes"
+        qti_paths = paths[: max(1, files // 10)]
+        for path in qti_paths:
+            target = qti_root / path.relative_to(root)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(path.read_bytes())
+        results.append(
+            _measure(
+                f"{suite}/qti",
+                sum(
+                    len(parse_quizdown(path.read_text(encoding="utf-8")))
+                    for path in qti_paths
+                ),
+                sum(path.stat().st_size for path in qti_paths),
+                lambda: run_batch(qti_root, Path(tmp) / "qti_build", "builtin"),
+                repeat,
+            )
+        )
+
+    return results
+
+
+def load_baseline(path: Path) -> Dict[str, BenchmarkResult]:
+    """Read stored results, keyed by benchmark name."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {
+        entry["name"]: BenchmarkResult(**entry) for entry in data.get("results", [])
+    }
+
+
+def write_baseline(path: Path, results: List[BenchmarkResult]) -> None:
+    """Store results as the new baseline."""
+    data = {
+        "python": sys.version.split()[0],
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def format_report(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> Tuple[str, List[str]]:
+    """Render the results table and list benchmarks slower than the baseline."""
+    lines = [
+        f"{'Benchmark':<24}{'Questions':>10}{'MB':>7}{'ms':>10}{'q/s':>10}"
+        f"{'MB/s':>8}{'Peak MB':>9}{'vs base':>9}"
+    ]
+    regressions: List[str] = []
+    for result in results:
+        base = baseline.get(result.name)
+        change = ""
+        if base is not None and base.seconds:
+            ratio = result.seconds / base.seconds
+            change = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio > 1 + threshold:
+                change += " ⚠️"
+                regressions.append(result.name)
+        lines.append(
+            f"{result.name:<24}{result.questions:>10}{result.bytes / 1_048_576:>7.2f}"
+            f"{result.seconds * 1000:>10.1f}{result.questions_per_second:>10.0f}"
+            f"{result.mb_per_second:>8.2f}{result.peak_memory / 1_048_576:>9.1f}"
+            f"{change:>9}"
+        )
+    return "\n".join(lines), regressions
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option(
+    "--questions",
+    type=click.IntRange(min=1),
+    default=5000,
+    show_default=True,
+    help="Questions in the generated bank.",
+)
+@click.option(
+    "--files",
+    type=click.IntRange(min=1),
+    default=50,
+    show_default=True,
+    help="Quiz files the bank is split into for the convert and batch benchmarks.",
+)
+@click.option(
+    "--choices",
+    "max_choices",
+    type=click.IntRange(min=2, max=26),
+    default=8,
+    show_default=True,
+    help="Maximum choices per question.",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Timed runs per benchmark.",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=BASELINE_PATH,
+    help="Baseline results to compare with.",
+)
+@click.option(
+    "--save-baseline", is_flag=True, help="Store these results as the baseline."
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD,
+    show_default=True,
+    help="Relative slowdown counted as a regression.",
+)
+@click.option(
+    "--fail-on-regression", is_flag=True, help="Exit with status 1 on regressions."
+)
+def main(
+    questions: int,
+    files: int,
+    max_choices: int,
+    repeat: int,
+    baseline: Path,
+    save_baseline: bool,
+    threshold: float,
+    fail_on_regression: bool,
+) -> None:
+    """Benchmark the Quizdown pipeline and compare with a stored baseline."""
+    click.echo("⏱️  Running quiz_to_qti benchmarks...")
+    results = run_benchmarks(questions, files, max_choices, repeat)
+
+    report, regressions = format_report(results, load_baseline(baseline), threshold)
+    click.echo(report)
+
+    if save_baseline:
+        write_baseline(baseline, results)
+        click.echo(f"Baseline written to {baseline}")
+    elif regressions:
+        click.echo(f"⚠️  Slower than baseline: {', '.join(regressions)}")
+        if fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Content-addressed cache of built QTI zips.
+
+A quiz's key hashes everything its zip depends on: the contents of its
+Quizdown files and of the local images they reference, the title, the
+description, the shuffle and show-correct flags, the engine, the text2qti
+configuration (including ~/.text2qti.bespon), the source of the converter
+modules and the versions of this package and text2qti. A batch build looks
+the key up before converting. On a hit the zip already in the output
+directory is kept if it matches, or is restored from the cache.
+"""
+
+from __future__ import annotations
+
+import filecmp
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from text2qti.version import __version__ as TEXT2QTI_VERSION
+
+from . import __version__
+from .qti_writer import load_config
+
+CACHE_DIRNAME = ".quiz_to_qti_cache"
+
+# Bump whenever the generated zips change in a way the key would not catch
+# (e.g. a dependency upgrade or a change to a module outside
+# CONVERTER_MODULES).
+BUILD_CACHE_VERSION = "1"
+
+# Modules whose code decides the contents of a zip. Editing one of them
+# invalidates every cached build without a version bump.
+CONVERTER_MODULES = ("batch.py", "converter.py", "qti_writer.py")
+
+
+def _converter_fingerprint() -> str:
+    """Hash of the converter modules' source."""
+    digest = hashlib.sha256()
+    package = Path(__file__).parent
+    for name in CONVERTER_MODULES:
+        digest.update(name.encode())
+        digest.update((package / name).read_bytes())
+    return digest.hexdigest()
+
+
+CONVERTER_FINGERPRINT = _converter_fingerprint()
+
+# Markdown image sources, as in ![alt](path "title") or ![alt](<path>)
+_IMAGE_RE = re.compile(r"!\[[^\]]*\]\(\s*(?:<([^>]*)>|([^)\s]+))")
+
+
+def _image_hashes(markdown: str) -> Dict[str, Optional[str]]:
+    """Hash of each local image the Markdown references, None if unreadable.
+
+    Paths resolve as text2qti resolves them: against the working directory.
+    """
+    hashes: Dict[str, Optional[str]] = {}
+    for bracketed, bare in _IMAGE_RE.findall(markdown):
+        src = bracketed or bare
+        if src in hashes or src.startswith(("http://", "https://")):
+            continue
+        try:
+            data = Path(src).expanduser().read_bytes()
+        except OSError:
+            hashes[src] = None
+        else:
+            hashes[src] = hashlib.sha256(data).hexdigest()
+    return hashes
+
+
+def build_key(
+    files: Iterable[Path],
+    *,
+    title: str,
+    description: Optional[str],
+    shuffle_answers: bool,
+    show_correct: bool,
+    engine: str,
+    config: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """Cache key of one quiz build.
+
+    config is the text2qti configuration the quiz is built with; it is loaded
+    as the text2qti command would load it when not given.
+    """
+    sources: List[str] = []
+    images: Dict[str, Optional[str]] = {}
+    for path in files:
+        content = path.read_bytes()
+        sources.append(hashlib.sha256(content).hexdigest())
+        images.update(_image_hashes(content.decode("utf-8", errors="replace")))
+    data = {
+        "cache": BUILD_CACHE_VERSION,
+        "quiz_to_qti": __version__,
+        "converter": CONVERTER_FINGERPRINT,
+        "text2qti": TEXT2QTI_VERSION,
+        "config": dict(load_config() if config is None else config),
+        "engine": engine,
+        "sources": sources,
+        "images": images,
+        "title": title,
+        "description": description,
+        "shuffle_answers": shuffle_answers,
+        "show_correct": show_correct,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class BuildCache:
+    """Built zips stored by key in one directory.
+
+    Writes are atomic, so concurrent builders never see partial entries.
+    Failures to write are ignored: the cache is an optimization.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.zip"
+
+    def restore(self, key: str, zip_path: Path) -> Optional[str]:
+        """Bring zip_path up to date from the cache.
+
+        Returns "skipped" if zip_path already holds the cached build,
+        "restored" if it was copied from the cache, or None on a miss.
+        """
+        cached = self._path(key)
+        if not cached.is_file():
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            if zip_path.is_file() and filecmp.cmp(cached, zip_path, shallow=False):
+                return "skipped"
+            self._copy(cached, zip_path)
+        except OSError:
+            self.hits -= 1
+            self.misses += 1
+            return None
+        return "restored"
+
+    def store(self, key: str, zip_path: Path) -> None:
+        """Keep a copy of a freshly built zip under its key."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._copy(zip_path, self._path(key))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _copy(source: Path, target: Path) -> None:
+        tmp_path = target.with_name(
+            f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            shutil.copyfile(source, tmp_path)
+            tmp_path.replace(target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
@@ -5,13 +5,31 @@ from pathlib import Path
 import sys
 import os
 import shutil
+from dataclasses import dataclass, field
 from typing import Iterable, Optional, Dict, List, Tuple
 import re
 
 import click
 
-from .converter import convert_quizdown_files
+from text2qti.err import Text2qtiError
+
+from .converter import QuizdownQuestion, convert_quizdown_files, iter_quizdown_files
 from .auto_description import auto_generate_description
+from .build_cache import CACHE_DIRNAME, BuildCache, build_key
+from .ollama_client import DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT as OLLAMA_TIMEOUT
+from .ollama_client import OllamaClient
+from .description_cache import (
+    DEFAULT_TTL_DAYS,
+    DESCRIPTIONS_DIRNAME,
+    DescriptionCache,
+    file_hashes,
+)
+from .pipeline import Stage, run_pipeline
+from .docs_index import DOCS_INDEX_FILENAME, DocsIndex
+from .qti_writer import build_qti_zip, load_config, write_qti_zip
+from .text2qti_pool import DEFAULT_TIMEOUT, Text2qtiPool
+
+ENGINES = ("builtin", "text2qti")
 
 
 def _sanitize_basename(title: str) -> str:
@@ -28,11 +46,36 @@ def _sanitize_basename(title: str) -> str:
     return safe or "quiz"
 
 
-def _write_temp_text2qti(content: str, dest_dir: Path, quiz_basename: str) -> Path:
+def _text2qti_input_path(dest_dir: Path, quiz_basename: str) -> Path:
     dest_dir.mkdir(parents=True, exist_ok=True)
-    path = dest_dir / f"{quiz_basename}.txt"
-    path.write_text(content, encoding="utf-8")
-    return path
+    return dest_dir / f"{quiz_basename}.txt"
+
+
+def _description_cache(
+    cache_dir: Path, ttl_days: float, disabled: bool
+) -> Optional[DescriptionCache]:
+    if disabled:
+        return None
+    return DescriptionCache(cache_dir / DESCRIPTIONS_DIRNAME, ttl_days=ttl_days)
+
+
+def _docs_index(docs_root: Path, cache_dir: Path) -> DocsIndex:
+    # Kept next to the caches and refreshed by mtime, so the docs are only
+    # re-read when they change
+    return DocsIndex(docs_root, cache_dir / DOCS_INDEX_FILENAME)
+
+
+def _find_text2qti() -> Path:
+    """Locate the text2qti console script, preferring the running venv."""
+    t2qti = Path(sys.executable).with_name("text2qti")
+    if t2qti.exists():
+        return t2qti
+    found = shutil.which("text2qti")
+    if not found:
+        raise SystemExit(
+            "Cannot find 'text2qti' console script. Ensure the text2qti package is installed in your environment."
+        )
+    return Path(found)
 
 
 @click.group(context_settings={"help_option_names": ["-h", "--help"]})
@@ -99,6 +142,25 @@ def cli() -> None:
     is_flag=True,
     help="Pass through to text2qti to convert LaTeX to MathML via Pandoc.",
 )
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default="builtin",
+    show_default=True,
+    help="Build the zip in-process (builtin) or via the external text2qti command.",
+)
+@click.option(
+    "--desc-ttl",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TTL_DAYS,
+    show_default=True,
+    help="Days a cached Ollama description stays valid.",
+)
+@click.option(
+    "--no-desc-cache",
+    is_flag=True,
+    help="Always ask Ollama; ignore cached descriptions.",
+)
 def convert_cmd(
     inputs: Iterable[Path],
     title_: str,
@@ -111,6 +173,9 @@ def convert_cmd(
     hide_correct: bool,
     out_dir: Path,
     pandoc_mathml: bool,
+    engine: str,
+    desc_ttl: float,
+    no_desc_cache: bool,
 ) -> None:
     """Convert Quizdown-style Markdown quizzes to a Canvas-importable QTI zip.
 
@@ -120,39 +185,51 @@ def convert_cmd(
     # Description selection
     final_desc = description
     if auto_desc or not description:
+        cache_dir = Path(out_dir) / CACHE_DIRNAME
+        desc_cache = _description_cache(cache_dir, desc_ttl, no_desc_cache)
         final_desc = auto_generate_description(
             inputs,
             title=title_,
             docs_root=docs_root,
             ollama_url=ollama_url,
             ollama_model=ollama_model,
+            cache=desc_cache,
+            docs_index=_docs_index(docs_root, cache_dir),
         )
 
-    quiz = convert_quizdown_files(
+    quiz_basename = _sanitize_basename(title_)
+    zip_path = Path(out_dir) / f"{quiz_basename}.zip"
+
+    if engine == "builtin":
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        try:
+            build_qti_zip(
+                inputs,
+                zip_path,
+                title=title_,
+                description=final_desc,
+                shuffle_answers=not no_shuffle,
+                show_correct=not hide_correct,
+                config=load_config(pandoc_mathml),
+            )
+        except Text2qtiError as e:
+            raise SystemExit(f"QTI build failed: {e}") from e
+        click.echo(f"QTI zip ready for Canvas import: {zip_path}")
+        return
+
+    # Stream text2qti plain text to a temp working path
+    txt_path = _text2qti_input_path(Path(out_dir), quiz_basename=quiz_basename)
+    convert_quizdown_files(
         inputs,
         title=title_,
         description=final_desc,
         shuffle_answers=not no_shuffle,
         show_correct=not hide_correct,
-    )
-
-    # Write text2qti plain text to a temp working path
-    quiz_basename = _sanitize_basename(title_)
-    txt_path = _write_temp_text2qti(
-        quiz.body, Path(out_dir), quiz_basename=quiz_basename
+        out=txt_path,
     )
 
     # Call text2qti to produce the QTI zip in same folder
-    t2qti = Path(sys.executable).with_name("text2qti")
-    if not t2qti.exists():
-        found = shutil.which("text2qti")
-        if found:
-            t2qti = Path(found)
-        else:
-            raise SystemExit(
-                "Cannot find 'text2qti' console script. Ensure the text2qti package is installed in your environment."
-            )
-    cmd = [str(t2qti)]
+    cmd = [str(_find_text2qti())]
     if pandoc_mathml:
         cmd.append("--pandoc-mathml")
     # Run from the output directory and pass only the filename so relative paths work
@@ -164,13 +241,67 @@ def convert_cmd(
         raise SystemExit(f"text2qti failed with exit code {e.returncode}") from e
 
     click.echo(f"Wrote text2qti input: {txt_path}")
-    zip_path = Path(out_dir) / f"{quiz_basename}.zip"
     if zip_path.exists():
         click.echo(f"QTI zip ready for Canvas import: {zip_path}")
     else:
         click.echo("text2qti did not produce a zip file. Check above for errors.")
 
 
+@cli.command(name="invalidate-descriptions")
+@click.argument(
+    "inputs",
+    nargs=-1,
+    type=click.Path(path_type=Path, exists=True, dir_okay=False),
+)
+@click.option(
+    "--out",
+    "out_dir",
+    type=click.Path(path_type=Path, file_okay=False),
+    default=Path("_quiz_build"),
+    show_default=True,
+    help="Output directory whose cache holds the descriptions.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(path_type=Path, file_okay=False),
+    default=None,
+    help=f"Cache directory, if not OUT/{CACHE_DIRNAME}.",
+)
+@click.option("--model", default=None, help="Only drop descriptions from this model.")
+@click.option("--expired", is_flag=True, help="Only drop descriptions past the TTL.")
+@click.option(
+    "--desc-ttl",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TTL_DAYS,
+    show_default=True,
+    help="Days a cached description stays valid (used with --expired).",
+)
+def invalidate_descriptions_cmd(
+    inputs: Iterable[Path],
+    out_dir: Path,
+    cache_dir: Optional[Path],
+    model: Optional[str],
+    expired: bool,
+    desc_ttl: float,
+) -> None:
+    """Delete cached Ollama descriptions so they are generated again.
+
+    With INPUTS, only descriptions of quizzes built from any of those files
+    are dropped; otherwise all matching entries are.
+    """
+    cache = DescriptionCache(
+        (cache_dir or out_dir / CACHE_DIRNAME) / DESCRIPTIONS_DIRNAME,
+        ttl_days=desc_ttl,
+    )
+    sources = file_hashes(inputs)
+    removed = cache.invalidate(
+        sources=sources or None,
+        model=model,
+        expired_only=expired,
+    )
+    click.echo(f"Removed {removed} cached descriptions from {cache.directory}")
+
+
 ############################
 # Batch builder subcommand #
 ############################
@@ -241,6 +372,19 @@ def _discover_quiz_groups(
     return groups
 
 
+@dataclass(slots=True)
+class _BatchJob:
+    """One quiz group on its way through the batch pipeline."""
+
+    title: str
+    files: List[Path]
+    description: Optional[str]
+    zip_path: Path
+    cache_key: str = ""
+    status: Optional[str] = None  # "built", "skipped" or "restored"
+    questions: List[QuizdownQuestion] = field(default_factory=list)
+
+
 @cli.command(name="batch")
 @click.option(
     "--root",
@@ -278,6 +422,62 @@ def _discover_quiz_groups(
     show_default=True,
     help="Root of Sphinx docs to use as context for auto description.",
 )
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default="builtin",
+    show_default=True,
+    help="Build zips in-process (builtin) or via the external text2qti command.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Warm text2qti worker processes used with --engine text2qti.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_TIMEOUT,
+    show_default=True,
+    help="Seconds one quiz may take in a text2qti worker before it is killed.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(path_type=Path, file_okay=False),
+    default=None,
+    help=f"Build cache directory (default: OUT/{CACHE_DIRNAME}).",
+)
+@click.option(
+    "--no-cache", is_flag=True, help="Rebuild every quiz; skip the build cache."
+)
+@click.option(
+    "--desc-ttl",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TTL_DAYS,
+    show_default=True,
+    help="Days a cached Ollama description stays valid.",
+)
+@click.option(
+    "--no-desc-cache",
+    is_flag=True,
+    help="Always ask Ollama; ignore cached descriptions.",
+)
+@click.option(
+    "--ollama-concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    help="Ollama requests in flight at once (each on a reused connection).",
+)
+@click.option(
+    "--ollama-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=OLLAMA_TIMEOUT,
+    show_default=True,
+    help="Seconds per Ollama request attempt; failures are retried with backoff.",
+)
 def batch_cmd(
     root: Path,
     out_dir: Path,
@@ -285,6 +485,15 @@ def batch_cmd(
     ollama_url: str,
     ollama_model: str,
     docs_root: Path,
+    engine: str,
+    workers: int,
+    timeout: float,
+    cache_dir: Optional[Path],
+    no_cache: bool,
+    desc_ttl: float,
+    no_desc_cache: bool,
+    ollama_concurrency: int,
+    ollama_timeout: float,
 ) -> None:
     """Discover and convert all quizzes under ROOT into OUT directory.
 
@@ -295,83 +504,150 @@ def batch_cmd(
     groups = _discover_quiz_groups(root)
     click.echo(f"Found {len(groups)} quiz groups to process")
 
-    # Locate text2qti
-    t2qti = Path(sys.executable).with_name("text2qti")
-    found = shutil.which("text2qti") if not t2qti.exists() else str(t2qti)
-    if not t2qti.exists() and not found:
-        raise SystemExit("text2qti not found in PATH or venv; please install it.")
-    if not t2qti.exists() and found:
-        t2qti = Path(found)
-
+    config = load_config()
     out_dir.mkdir(parents=True, exist_ok=True)
+    # Quizzes whose sources and options are unchanged are restored, not rebuilt
+    cache = None if no_cache else BuildCache(cache_dir or out_dir / CACHE_DIRNAME)
+    desc_cache = _description_cache(
+        cache_dir or out_dir / CACHE_DIRNAME, desc_ttl, no_desc_cache
+    )
 
-    # First, generate all descriptions serially to avoid overloading Ollama
-    descriptions = {}
+    # The external engine converts in warm worker processes that import
+    # text2qti once; they start now and load while descriptions are generated
+    pool: Optional[Text2qtiPool] = None
+    if engine == "text2qti":
+        pool = Text2qtiPool(min(workers, max(1, len(groups))), timeout=timeout)
+
+    # Each group flows through describe -> convert -> package on its own,
+    # so the first zip is ready after one pass instead of after every
+    # description; bounded queues keep fast stages from running far ahead
+    client: Optional[OllamaClient] = None
+    docs_index: Optional[DocsIndex] = None
     if auto_desc:
-        click.echo("Generating descriptions using Ollama...")
-        for i, (key, title, files, _) in enumerate(groups, 1):
+        client = OllamaClient(
+            ollama_url, concurrency=ollama_concurrency, timeout=ollama_timeout
+        )
+        docs_index = _docs_index(docs_root, cache_dir or out_dir / CACHE_DIRNAME)
+
+    try:
+        def describe(job: _BatchJob) -> _BatchJob:
             try:
-                click.echo(f"[{i}/{len(groups)}] Generating description for {title}")
-                desc = auto_generate_description(
-                    files,
-                    title=title,
+                job.description = auto_generate_description(
+                    job.files,
+                    title=job.title,
                     docs_root=docs_root,
                     ollama_url=ollama_url,
                     ollama_model=ollama_model,
+                    cache=desc_cache,
+                    client=client,
+                    docs_index=docs_index,
+                )
+            except Exception:
+                click.echo(f"Failed to generate description for {job.title}")
+                job.description = f"Quiz on {job.title}"  # Simple fallback
+            return job
+
+        def convert(job: _BatchJob) -> _BatchJob:
+            job.cache_key = build_key(
+                job.files,
+                title=job.title,
+                description=job.description,
+                shuffle_answers=True,
+                show_correct=True,
+                engine=engine,
+                config=config,
+            )
+            if cache is not None:
+                job.status = cache.restore(job.cache_key, job.zip_path)
+                if job.status is not None:
+                    return job
+            if pool is None:
+                job.questions = list(iter_quizdown_files(job.files))
+            else:
+                convert_quizdown_files(
+                    job.files,
+                    title=job.title,
+                    description=job.description,
+                    shuffle_answers=True,
+                    show_correct=True,
+                    out=job.zip_path.with_suffix(".txt"),
                 )
-                descriptions[key] = desc
-            except Exception as e:
-                click.echo(f"[{i}/{len(groups)}] Failed to generate description for {title}")
-                descriptions[key] = f"Quiz on {title}"  # Simple fallback
-
-    # Build in parallel (now descriptions are already generated)
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
-    def build_one(_key: str, title: str, files: List[Path], desc: Optional[str]) -> str:
-        # Use the pre-generated description or fallback to the original
-        final_desc = descriptions.get(_key) if auto_desc else desc
-
-        converted = convert_quizdown_files(
-            files,
-            title=title,
-            description=final_desc,
-            shuffle_answers=True,
-            show_correct=True,
+            return job
+
+        def package(job: _BatchJob) -> _BatchJob:
+            if job.status is not None:
+                return job
+            if pool is None:
+                write_qti_zip(
+                    job.questions,
+                    job.zip_path,
+                    title=job.title,
+                    description=job.description,
+                    shuffle_answers=True,
+                    show_correct=True,
+                    config=config,
+                )
+                job.questions = []
+            else:
+                job.zip_path = pool.convert(job.zip_path.with_suffix(".txt"))
+            if cache is not None:
+                cache.store(job.cache_key, job.zip_path)
+            job.status = "built"
+            return job
+
+        if pool is not None:
+            package_workers = pool.workers
+        else:
+            package_workers = min(8, max(2, len(groups)))
+        stages = [
+            Stage("convert", convert, workers=2),
+            Stage("package", package, workers=package_workers),
+        ]
+        if auto_desc:
+            click.echo(
+                "Generating descriptions using Ollama "
+                f"({ollama_concurrency} at a time)..."
+            )
+            stages.insert(0, Stage("describe", describe, workers=ollama_concurrency))
+
+        jobs = (
+            _BatchJob(title, files, desc, out_dir / f"{_sanitize_basename(title)}.zip")
+            for _, title, files, desc in groups
         )
-        basename = _sanitize_basename(title)
-        txt_path = out_dir / f"{basename}.txt"
-        txt_path.write_text(converted.body, encoding="utf-8")
-        cmd = [str(t2qti), txt_path.name]
-        subprocess.run(cmd, cwd=str(out_dir), check=True, text=True, input="\n")
-        return str(out_dir / f"{basename}.zip")
-
-    results: List[str] = []
-    errors: List[str] = []
-    click.echo(f"Building {len(groups)} quizzes in parallel...")
-    with ThreadPoolExecutor(max_workers=min(8, max(2, len(groups)))) as ex:
-        futures = {ex.submit(build_one, k, t, f, d): (k, t) for (k, t, f, d) in groups}
-        completed = 0
-        for fut in as_completed(futures):
-            key, title = futures[fut]
-            completed += 1
-            try:
-                zip_path = fut.result()
-                results.append(zip_path)
-                click.echo(f"[{completed}/{len(groups)}] Built {Path(zip_path).name}")
-            except subprocess.CalledProcessError as e:
-                errors.append(f"{title}: text2qti failed with exit code {e.returncode}")
-                click.echo(f"[{completed}/{len(groups)}] Failed to build {title}")
-            except Exception as e:
-                errors.append(f"{title}: {e}")
-                click.echo(f"[{completed}/{len(groups)}] Failed to build {title}")
-
-    # Summary
-    click.echo(f"\nSummary: Successfully built {len(results)} of {len(groups)} quizzes")
-    if errors:
-        click.echo(f"Failed to build {len(errors)} quizzes:")
-        for error in errors:
-            click.echo(f"  - {error}")
-        raise SystemExit(1)
+        results: List[str] = []
+        errors: List[str] = []
+        verb = {"built": "Built", "skipped": "Unchanged", "restored": "Restored"}
+        click.echo(f"Building {len(groups)} quizzes in a pipeline...")
+        for completed, result in enumerate(run_pipeline(jobs, stages), 1):
+            job = result.value
+            if job is None:
+                # The input failed before yielding a quiz, so no title to report
+                errors.append(f"{result.stage}: {result.error}")
+                click.echo(f"Failed to read the quizzes: {result.error}")
+                continue
+            if result.error is not None:
+                errors.append(f"{job.title}: {result.error}")
+                click.echo(f"[{completed}/{len(groups)}] Failed to build {job.title}")
+                continue
+            results.append(str(job.zip_path))
+            click.echo(
+                f"[{completed}/{len(groups)}] {verb[job.status]} {job.zip_path.name}"
+            )
+
+        # Summary
+        click.echo(
+            f"\nSummary: Successfully built {len(results)} of {len(groups)} quizzes"
+        )
+        if errors:
+            click.echo(f"Failed to build {len(errors)} quizzes:")
+            for error in errors:
+                click.echo(f"  - {error}")
+            raise SystemExit(1)
+    finally:
+        if client is not None:
+            client.close()
+        if pool is not None:
+            pool.close()
 
 
 if __name__ == "__main__":
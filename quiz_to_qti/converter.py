@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+from array import array
+from collections.abc import Sequence as SequenceABC
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 import re
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+    overload,
+)
 
 
 @dataclass(slots=True)
@@ -28,11 +43,164 @@ class QuizdownQuestion:
 
 @dataclass(slots=True)
 class ConvertedQuiz:
-    """The fully converted quiz text2qti plaintext ready for writing to disk."""
+    """A converted quiz whose text2qti plaintext is produced on demand.
+
+    ``source`` is either the path of a file the plaintext was already written
+    to, or an iterable of text chunks rendered lazily from the questions. Use
+    write() to stream it to a file or text stream; ``body`` builds the whole
+    text in memory and is meant for small quizzes and debugging.
+    """
 
     title: str
     description: Optional[str]
-    body: str
+    source: Union[Path, Iterable[str]]
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self.source if isinstance(self.source, Path) else None
+
+    def iter_text(self) -> Iterator[str]:
+        if isinstance(self.source, Path):
+            with self.source.open(encoding="utf-8") as fh:
+                yield from fh
+        else:
+            yield from self.source
+
+    def write(self, target: Union[Path, TextIO]) -> None:
+        """Stream the plaintext to a file path or an open text stream."""
+        if isinstance(target, Path):
+            if self.path is not None and target.resolve() == self.path.resolve():
+                return
+            with target.open("w", encoding="utf-8") as fh:
+                fh.writelines(self.iter_text())
+        else:
+            target.writelines(self.iter_text())
+
+    @property
+    def body(self) -> str:
+        return "".join(self.iter_text())
+
+
+_NO_STRING = -1
+# Only short strings (choice texts like "True" or "for loop") tend to repeat;
+# interning longer ones would keep a Python copy of every prompt alive
+_INTERN_MAX_LENGTH = 32
+
+
+class QuestionBank(SequenceABC[QuizdownQuestion]):
+    """Compact, append-only sequence of parsed questions.
+
+    Every string is stored once as UTF-8 in a shared buffer and referenced by
+    its index; short strings are interned so repeated choices share storage.
+    Per-question and per-choice fields live in typed arrays and the correct
+    flags of all choices in one bitset. Indexing returns a freshly built
+    QuizdownQuestion, so the bank can be passed anywhere a sequence of
+    questions is expected; changing that object does not change the bank.
+    """
+
+    def __init__(self, questions: Iterable[QuizdownQuestion] = ()) -> None:
+        self._text = bytearray()
+        # String i is _text[_offsets[i]:_offsets[i + 1]]
+        self._offsets = array("Q", [0])
+        self._interned: Dict[str, int] = {}
+        self._prompts = array("i")
+        self._general_feedback = array("i")
+        # Choices of question i are _choice_starts[i]:_choice_starts[i + 1]
+        self._choice_starts = array("I", [0])
+        self._choice_texts = array("i")
+        self._choice_feedback = array("i")
+        self._correct = bytearray()
+        # Titles and points are rarely set: question index -> (title, points)
+        self._extras: Dict[int, Tuple[Optional[str], Optional[float]]] = {}
+        self.extend(questions)
+
+    def _store(self, text: Optional[str]) -> int:
+        if text is None:
+            return _NO_STRING
+        short = len(text) <= _INTERN_MAX_LENGTH
+        if short:
+            index = self._interned.get(text)
+            if index is not None:
+                return index
+        self._text += text.encode("utf-8")
+        self._offsets.append(len(self._text))
+        index = len(self._offsets) - 2
+        if short:
+            self._interned[text] = index
+        return index
+
+    def _load(self, index: int) -> Optional[str]:
+        if index == _NO_STRING:
+            return None
+        offsets = self._offsets
+        return self._text[offsets[index] : offsets[index + 1]].decode("utf-8")
+
+    def append(self, question: QuizdownQuestion) -> None:
+        self._prompts.append(self._store(question.prompt_md))
+        self._general_feedback.append(self._store(question.general_feedback_md))
+        for is_correct, text, feedback in question.choices:
+            choice = len(self._choice_texts)
+            if choice % 8 == 0:
+                self._correct.append(0)
+            if is_correct:
+                self._correct[choice >> 3] |= 1 << (choice & 7)
+            self._choice_texts.append(self._store(text))
+            self._choice_feedback.append(self._store(feedback))
+        self._choice_starts.append(len(self._choice_texts))
+        if question.title is not None or question.points is not None:
+            self._extras[len(self._prompts) - 1] = (question.title, question.points)
+
+    def extend(self, questions: Iterable[QuizdownQuestion]) -> None:
+        for question in questions:
+            self.append(question)
+
+    def __len__(self) -> int:
+        return len(self._prompts)
+
+    @overload
+    def __getitem__(self, index: int) -> QuizdownQuestion: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[QuizdownQuestion]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[QuizdownQuestion, List[QuizdownQuestion]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("question index out of range")
+        return self._question(index)
+
+    def __iter__(self) -> Iterator[QuizdownQuestion]:
+        for index in range(len(self)):
+            yield self._question(index)
+
+    def _question(self, index: int) -> QuizdownQuestion:
+        load = self._load
+        correct = self._correct
+        texts = self._choice_texts
+        feedback = self._choice_feedback
+        choices: List[Tuple[bool, str, Optional[str]]] = [
+            (
+                bool(correct[choice >> 3] & (1 << (choice & 7))),
+                load(texts[choice]) or "",
+                load(feedback[choice]),
+            )
+            for choice in range(
+                self._choice_starts[index], self._choice_starts[index + 1]
+            )
+        ]
+        title, points = self._extras.get(index, (None, None))
+        return QuizdownQuestion(
+            prompt_md=load(self._prompts[index]) or "",
+            choices=choices,
+            general_feedback_md=load(self._general_feedback[index]),
+            title=title,
+            points=points,
+        )
 
 
 QUIZDOWN_Q_BLOCK_RE = re.compile(
@@ -43,6 +211,163 @@ CHOICE_RE = re.compile(r"^\s*1?\.?\s*\[(?P<mark> |x|X)\]\s+(?P<text>.*)$", re.M)
 FEEDBACK_RE = re.compile(r"^\s*>\s+(?P<fb>.+)$", re.M)
 
 
+# Line patterns of the streaming parser. Each is matched at the start of a line.
+_HEADING_LINE_RE = re.compile(r"\s*###\s+")
+_CHOICE_LINE_RE = re.compile(r"\s*1?\.?\s*\[(?P<mark>[ xX])\]")
+_QUOTE_LINE_RE = re.compile(r"\s*>")
+_QUOTE_PREFIX_RE = re.compile(r"^\s*>\s?", re.M)
+
+
+class _QuestionParser:
+    """Line state machine for the lines below one question heading.
+
+    Phases: leading blockquote lines are general feedback; the lines after it
+    up to the first choice are ignored; every choice then collects the
+    blockquote lines below it as per-choice feedback. A blockquote line with
+    nothing after ``>`` (and a choice with no text after ``]``) continues on
+    the next non-blank line, which is resolved when that line arrives.
+    """
+
+    __slots__ = (
+        "prompt",
+        "in_general",
+        "general_lines",
+        "general_blanks",
+        "general_open",
+        "choices",
+        "pending_choice",
+        "feedback_open",
+    )
+
+    def __init__(self, prompt: str) -> None:
+        self.prompt = prompt
+        self.in_general = True
+        self.general_lines: List[str] = []
+        # Blank lines after general feedback; kept only if more feedback follows
+        self.general_blanks: List[str] = []
+        self.general_open = False
+        self.choices: List[Tuple[bool, str, List[str]]] = []
+        # (is_correct, line) of a choice whose text is on the next non-blank line
+        self.pending_choice: Optional[Tuple[bool, str]] = None
+        # Whitespace after ">" of a feedback line that continues on the next line
+        self.feedback_open: Optional[str] = None
+
+    def feed(self, line: str) -> None:
+        if self.in_general and self._feed_general(line):
+            return
+        if not line.strip():
+            return
+
+        if self.pending_choice is not None:
+            is_correct = self.pending_choice[0]
+            self.pending_choice = None
+            self._close_feedback()
+            self.choices.append((is_correct, line.strip(), []))
+            self._feed_feedback(line)
+            return
+
+        m = _CHOICE_LINE_RE.match(line)
+        if m:
+            is_correct = m.group("mark") != " "
+            after = line[m.end() :]
+            if not after.strip():
+                self.pending_choice = (is_correct, line)
+                return
+            if after[0].isspace():
+                self._close_feedback()
+                self.choices.append((is_correct, after.strip(), []))
+                return
+
+        if self.choices:
+            self._feed_feedback(line)
+
+    def _feed_general(self, line: str) -> bool:
+        """Consume a line of leading general feedback; False once it has ended."""
+        if not line.strip():
+            if self.general_lines:
+                self.general_blanks.append(line)
+            return True
+        if self.general_open:
+            # Continuation of a bare ">" line, whatever it contains
+            self.general_open = False
+        else:
+            m = _QUOTE_LINE_RE.match(line)
+            if not m:
+                self.in_general = False
+                self.general_blanks = []
+                return False
+            self.general_open = not line[m.end() :].strip()
+        self.general_lines += self.general_blanks
+        self.general_lines.append(line)
+        self.general_blanks = []
+        return True
+
+    def _feed_feedback(self, line: str) -> None:
+        """Collect per-choice feedback from a non-blank line below a choice."""
+        feedback = self.choices[-1][2]
+        if self.feedback_open is not None:
+            self.feedback_open = None
+            feedback.append(line.lstrip())
+            return
+        m = _QUOTE_LINE_RE.match(line)
+        if m:
+            after = line[m.end() :]
+            if not after.strip():
+                self.feedback_open = after
+            elif after[0].isspace():
+                feedback.append(after.lstrip())
+
+    def _close_feedback(self) -> None:
+        """A new choice starts while the last feedback line waits to continue."""
+        after = self.feedback_open
+        self.feedback_open = None
+        if after is not None and len(after) >= 2:
+            self.choices[-1][2].append(after[-1])
+
+    def finish(self) -> QuizdownQuestion:
+        # The last line of a question is right-stripped, so a continuation
+        # that never arrived ends the feedback or choice without it
+        if self.general_open:
+            self.general_lines.pop()
+        if self.pending_choice is not None and self.choices:
+            self._feed_feedback(self.pending_choice[1].rstrip())
+        self.feedback_open = None
+
+        general_fb: Optional[str] = None
+        if self.general_lines:
+            block = "".join(f"{line}\n" for line in self.general_lines)
+            general_fb = _QUOTE_PREFIX_RE.sub("", block).strip()
+
+        choices: List[Tuple[bool, str, Optional[str]]] = [
+            (is_correct, text, "\n".join(fb).strip() if fb else None)
+            for is_correct, text, fb in self.choices
+        ]
+        return QuizdownQuestion(
+            prompt_md=self.prompt, choices=choices, general_feedback_md=general_fb
+        )
+
+
+def iter_quizdown(lines: Iterable[str]) -> Iterator[QuizdownQuestion]:
+    """Parse Quizdown-style Markdown lazily, one question at a time.
+
+    ``lines`` may be any iterable of lines, with or without line endings, such
+    as an open file. Each line is visited once and only the current question
+    is held in memory. See parse_quizdown for the syntax.
+    """
+    parser: Optional[_QuestionParser] = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        heading = _HEADING_LINE_RE.match(line)
+        if heading:
+            if parser is not None:
+                yield parser.finish()
+            parser = _QuestionParser(line[heading.end() :].strip())
+        elif parser is not None:
+            parser.feed(line)
+    if parser is not None:
+        yield parser.finish()
+
+
 def parse_quizdown(md: str) -> List[QuizdownQuestion]:
     """Parse a Quizdown-style Markdown quiz into questions.
 
@@ -52,65 +377,7 @@ def parse_quizdown(md: str) -> List[QuizdownQuestion]:
     a choice. A leading blockquote block before the first choice is treated
     as general feedback for the question.
     """
-    questions: List[QuizdownQuestion] = []
-
-    lines = md.splitlines()
-    i = 0
-    n = len(lines)
-
-    def is_heading(idx: int) -> bool:
-        return idx < n and re.match(r"^\s*###\s+", lines[idx]) is not None
-
-    while i < n:
-        if not is_heading(i):
-            i += 1
-            continue
-        # Extract prompt from heading line
-        prompt = re.sub(r"^\s*###\s+", "", lines[i]).strip()
-        i += 1
-        # Collect block until next heading or EOF
-        start = i
-        while i < n and not is_heading(i):
-            i += 1
-        block = "\n".join(lines[start:i]).strip()
-
-        # General feedback: consecutive leading blockquote lines
-        general_fb: Optional[str] = None
-        body = block
-        m_fb = re.match(r"^(?:\s*>\s*.+\n?)+", body, flags=re.M)
-        if m_fb:
-            fb_block = m_fb.group(0)
-            general_fb = re.sub(r"^\s*>\s?", "", fb_block, flags=re.M).strip()
-            body = body[len(fb_block) :].lstrip()
-
-        # Choices: find all checklist items and their trailing feedback segments
-        choices: List[Tuple[bool, str, Optional[str]]] = []
-        matches = list(re.finditer(CHOICE_RE, body))
-        for j, m in enumerate(matches):
-            start_pos = m.start()
-            end_pos = matches[j + 1].start() if j + 1 < len(matches) else len(body)
-            chunk = body[start_pos:end_pos]
-            # Choice line text
-            is_correct = m.group("mark").lower() == "x"
-            choice_text = m.group("text").strip()
-            # Per-choice feedback from blockquote lines in the chunk (after first line)
-            nl = chunk.find("\n")
-            rest = chunk[nl + 1 :] if nl != -1 else ""
-            fb_lines = [mm.group(1) for mm in re.finditer(r"^\s*>\s+(.+)$", rest, re.M)]
-            per_choice_fb = "\n".join(fb_lines).strip() if fb_lines else None
-            choices.append((is_correct, choice_text, per_choice_fb))
-
-        if not choices:
-            q = QuizdownQuestion(
-                prompt_md=prompt, choices=[], general_feedback_md=general_fb
-            )
-        else:
-            q = QuizdownQuestion(
-                prompt_md=prompt, choices=choices, general_feedback_md=general_fb
-            )
-        questions.append(q)
-
-    return questions
+    return list(iter_quizdown(md.splitlines()))
 
 
 def _to_text2qti_question(q: QuizdownQuestion, idx: int) -> str:
@@ -161,15 +428,10 @@ def _to_text2qti_question(q: QuizdownQuestion, idx: int) -> str:
     return "\n".join(lines) + "\n"
 
 
-def to_text2qti_plaintext(
-    questions: Sequence[QuizdownQuestion],
-    *,
-    title: str,
-    description: Optional[str],
-    shuffle_answers: bool,
-    show_correct: bool,
-) -> ConvertedQuiz:
-    """Render questions into a text2qti plaintext string with quiz options.
+def _text2qti_header(
+    title: str, description: Optional[str], shuffle_answers: bool, show_correct: bool
+) -> str:
+    """text2qti header lines.
 
     text2qti header supports:
       Quiz title: <title>
@@ -182,13 +444,76 @@ def to_text2qti_plaintext(
         header.append(f"Quiz description: {description}")
     header.append(f"shuffle answers: {'true' if shuffle_answers else 'false'}")
     header.append(f"show correct answers: {'true' if show_correct else 'false'}")
+    return "\n".join(header) + "\n"
+
+
+def iter_text2qti_plaintext(
+    questions: Iterable[QuizdownQuestion],
+    *,
+    title: str,
+    description: Optional[str],
+    shuffle_answers: bool,
+    show_correct: bool,
+) -> Iterator[str]:
+    """Yield text2qti plaintext chunk by chunk: the header, then each question.
 
-    body_parts = ["\n".join(header), ""]
+    Questions are rendered one at a time as they are consumed, so any
+    iterable (such as iter_quizdown over open files) streams in constant
+    memory.
+    """
+    yield _text2qti_header(title, description, shuffle_answers, show_correct)
+    # One question is held back so the text can end with a single newline
+    previous: Optional[str] = None
     for i, q in enumerate(questions, start=1):
-        body_parts.append(_to_text2qti_question(q, i))
+        if previous is not None:
+            yield "\n" + previous
+        previous = _to_text2qti_question(q, i)
+    if previous is not None:
+        yield "\n" + previous.rstrip() + "\n"
+
+
+class _LazyPlaintext:
+    """Re-iterable plaintext: every iteration renders the questions again."""
+
+    __slots__ = ("_render",)
+
+    def __init__(self, render: Callable[[], Iterator[str]]) -> None:
+        self._render = render
 
-    body = "\n".join(body_parts).strip() + "\n"
-    return ConvertedQuiz(title=title, description=description, body=body)
+    def __iter__(self) -> Iterator[str]:
+        return self._render()
+
+
+def to_text2qti_plaintext(
+    questions: Sequence[QuizdownQuestion],
+    *,
+    title: str,
+    description: Optional[str],
+    shuffle_answers: bool,
+    show_correct: bool,
+) -> ConvertedQuiz:
+    """Render questions into text2qti plaintext with quiz options.
+
+    Nothing is rendered until the returned quiz is written or iterated.
+    """
+    plaintext = _LazyPlaintext(
+        partial(
+            iter_text2qti_plaintext,
+            questions,
+            title=title,
+            description=description,
+            shuffle_answers=shuffle_answers,
+            show_correct=show_correct,
+        )
+    )
+    return ConvertedQuiz(title=title, description=description, source=plaintext)
+
+
+def iter_quizdown_files(files: Iterable[Path]) -> Iterator[QuizdownQuestion]:
+    """Stream the questions of several Quizdown files, in order."""
+    for fp in files:
+        with fp.open(encoding="utf-8") as fh:
+            yield from iter_quizdown(fh)
 
 
 def convert_quizdown_files(
@@ -198,19 +523,32 @@ def convert_quizdown_files(
     description: Optional[str] = None,
     shuffle_answers: bool = True,
     show_correct: bool = True,
+    out: Optional[Path] = None,
 ) -> ConvertedQuiz:
     """Parse and merge multiple Quizdown Markdown files into one text2qti quiz.
 
     The questions from each file are appended in order. Title/description apply
     to the combined quiz. Feedback comments are preserved.
+
+    With ``out``, questions stream from the input files straight into that
+    file and are never all held in memory. Otherwise they are kept in a
+    compact QuestionBank and rendered when the quiz is written.
     """
-    all_questions: List[QuizdownQuestion] = []
-    for fp in files:
-        text = fp.read_text(encoding="utf-8")
-        qs = parse_quizdown(text)
-        all_questions.extend(qs)
+    if out is not None:
+        with out.open("w", encoding="utf-8") as fh:
+            fh.writelines(
+                iter_text2qti_plaintext(
+                    iter_quizdown_files(files),
+                    title=title,
+                    description=description,
+                    shuffle_answers=shuffle_answers,
+                    show_correct=show_correct,
+                )
+            )
+        return ConvertedQuiz(title=title, description=description, source=out)
+
     return to_text2qti_plaintext(
-        all_questions,
+        QuestionBank(iter_quizdown_files(files)),
         title=title,
         description=description,
         shuffle_answers=shuffle_answers,
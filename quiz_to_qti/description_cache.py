@@ -0,0 +1,130 @@
+"""On-disk cache of Ollama-generated quiz descriptions.
+
+An entry is keyed by the hash of the prompt, the model name and the hash of
+the quiz's Markdown files, and records when it was generated. Entries older
+than the cache's TTL are ignored and replaced on the next run. Only real
+model output is cached, never the fallback text used when Ollama fails.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+DESCRIPTIONS_DIRNAME = "descriptions"
+
+DEFAULT_TTL_DAYS = 30.0
+
+
+def file_hashes(files: Iterable[Path]) -> List[str]:
+    """Hash of each of a quiz's Markdown files, in order."""
+    return [hashlib.sha256(Path(path).read_bytes()).hexdigest() for path in files]
+
+
+def content_hash(sources: Sequence[str]) -> str:
+    """Hash of a whole quiz from its file hashes."""
+    return hashlib.sha256("\0".join(sources).encode("utf-8")).hexdigest()
+
+
+class DescriptionCache:
+    """Generated descriptions stored one JSON file per key.
+
+    Writes are atomic and failures to write are ignored: the cache is an
+    optimization. A TTL of None keeps entries forever.
+    """
+
+    def __init__(self, directory: Path, ttl_days: Optional[float] = DEFAULT_TTL_DAYS):
+        self.directory = Path(directory)
+        self.ttl_seconds = None if ttl_days is None else ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, prompt: str, model: str, quiz_hash: str) -> str:
+        """Cache key of one description request."""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            "\0".join((prompt_hash, model, quiz_hash)).encode("utf-8")
+        ).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        created = entry.get("created")
+        if not isinstance(created, (int, float)):
+            return True
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached description, or None if missing or expired."""
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        description = entry.get("description")
+        if not isinstance(description, str) or self._expired(entry, time.time()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return description
+
+    def put(
+        self, key: str, description: str, *, model: str, sources: Sequence[str]
+    ) -> None:
+        """Store a generated description with the file hashes of its quiz."""
+        path = self._path(key)
+        tmp_path = path.with_name(
+            f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        entry = {
+            "created": time.time(),
+            "model": model,
+            "sources": list(sources),
+            "description": description,
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(entry, indent=2), encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def invalidate(
+        self,
+        *,
+        sources: Optional[Iterable[str]] = None,
+        model: Optional[str] = None,
+        expired_only: bool = False,
+    ) -> int:
+        """Delete entries, optionally only those of some quizzes or one model.
+
+        ``sources`` are file hashes; entries of quizzes built from any of
+        those files are deleted. Returns the number of deleted entries.
+        """
+        wanted = None if sources is None else set(sources)
+        now = time.time()
+        removed = 0
+        try:
+            paths = list(self.directory.glob("*.json"))
+        except OSError:
+            return 0
+        for path in paths:
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                entry = {}
+            if wanted is not None and wanted.isdisjoint(entry.get("sources") or ()):
+                continue
+            if model is not None and entry.get("model") != model:
+                continue
+            if expired_only and not self._expired(entry, now):
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
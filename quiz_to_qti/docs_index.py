@@ -0,0 +1,403 @@
+"""Persistent inverted index over the RST docs.
+
+Finding the docs that best match a quiz used to read and tokenize every .rst
+file under the docs root, once per quiz. A DocsIndex splits each file at its
+section titles and maps each term to the sections it appears in with its
+frequency there, and keeps the text of each section, in one JSON file.
+Refreshing the index re-reads only files whose modification time or size
+changed and drops deleted ones, so picking the docs for a quiz is a lookup.
+
+Sections are ranked with Okapi BM25, which weighs each shared term by its
+frequency in the section and its rarity across the docs, normalized by
+section length. Each term's BM25 weights do not depend on the query, so
+they are computed once per refresh; scoring a query adds up the weight
+vectors of its terms, with NumPy when it is installed.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DOCS_INDEX_FILENAME = "docs_index.json"
+
+# Bump whenever tokenization or the stored fields change
+DOCS_INDEX_VERSION = 2
+
+# Longest section text kept in the index
+SNIPPET_CHARS = 1500
+
+# Okapi BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_STOPWORDS = {
+    "a",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "but",
+    "by",
+    "for",
+    "if",
+    "in",
+    "into",
+    "is",
+    "it",
+    "no",
+    "not",
+    "of",
+    "on",
+    "or",
+    "such",
+    "that",
+    "the",
+    "their",
+    "then",
+    "there",
+    "these",
+    "they",
+    "this",
+    "to",
+    "was",
+    "with",
+    "you",
+    "your",
+    "we",
+    "our",
+}
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9_\-]+")
+
+# A row of one repeated punctuation character: a section title adornment
+_ADORNMENT_RE = re.compile(r"^([!-/:-@\[-`{-~])\1*\s*$")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of text, without stopwords and very short words."""
+    toks = [t.lower() for t in _WORD_RE.findall(text)]
+    return [t for t in toks if t not in _STOPWORDS and len(t) > 2]
+
+
+def read_text_safe(p: Path) -> str:
+    """Text of a file, ignoring undecodable bytes; empty if unreadable."""
+    try:
+        return p.read_text(encoding="utf-8")
+    except Exception:
+        try:
+            return p.read_text(errors="ignore")
+        except Exception:
+            return ""
+
+
+def doc_title_from_path(p: Path) -> str:
+    name = p.stem.replace("_", " ").replace("-", " ")
+    title = re.sub(r"\s+", " ", name).strip().title()
+    return title or p.stem
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split RST text at its section titles into (title, body) pairs.
+
+    A title is a line underlined, and optionally overlined, with a row of one
+    punctuation character. Only overlined titles may be indented, so literal
+    blocks are never split. Text before the first title has an empty title;
+    sections with no body are dropped.
+    """
+    lines = text.splitlines()
+    sections: List[Tuple[str, str]] = []
+    title, start, i = "", 0, 0
+    while i < len(lines) - 1:
+        line, under = lines[i].rstrip(), lines[i + 1].rstrip()
+        overlined = i > 0 and lines[i - 1].rstrip() == under
+        if (
+            line.strip()
+            and (overlined or not line[0].isspace())
+            and not _ADORNMENT_RE.match(line)
+            and _ADORNMENT_RE.match(under)
+            and len(under) >= min(len(line.strip()), 4)
+        ):
+            end = i - 1 if overlined else i
+            sections.append((title, "\n".join(lines[start:end]).strip()))
+            title, start = line.strip(), i + 2
+            i += 2
+            continue
+        i += 1
+    sections.append((title, "\n".join(lines[start:]).strip()))
+    return [(title, body) for title, body in sections if body]
+
+
+def _section_title(doc_title: str, heading: str) -> str:
+    if not heading:
+        return doc_title
+    if heading.lower() == doc_title.lower():
+        return heading
+    return f"{doc_title}: {heading}"
+
+
+@dataclass(slots=True)
+class DocEntry:
+    """One indexed .rst file."""
+
+    path: str  # Relative to the docs root, with forward slashes
+    mtime_ns: int
+    size: int
+    sections: int  # Number of sections, with ids "<path>#0" onwards
+
+
+@dataclass(slots=True)
+class Section:
+    """One section of an indexed file; sections are what search ranks."""
+
+    id: str
+    path: str
+    title: str  # The file's title, then the section's
+    length: int  # Number of tokens
+    text: str
+
+
+def _id_sort_key(section_id: str) -> Tuple[str, int]:
+    path, _, n = section_id.rpartition("#")
+    return path, int(n)
+
+
+class _Ranker:
+    """BM25 weights of every term, as sparse vectors over the sections.
+
+    ``terms`` maps a term to the positions (in ``ids``) of the sections
+    containing it and its BM25 weight in each. Positions follow the sorted
+    ids, so ties rank by path.
+    """
+
+    __slots__ = ("ids", "terms")
+
+    def __init__(
+        self, lengths: Dict[str, int], postings: Dict[str, Dict[str, int]]
+    ) -> None:
+        self.ids = sorted(lengths, key=_id_sort_key)
+        position = {rel: i for i, rel in enumerate(self.ids)}
+        n = len(self.ids)
+        avgdl = sum(lengths.values()) / n if n else 0.0
+        norm: Dict[str, float] = {}
+        for rel in self.ids:
+            ratio = lengths[rel] / avgdl if avgdl else 1.0
+            norm[rel] = BM25_K1 * (1 - BM25_B + BM25_B * ratio)
+        # (positions, weights) as lists, or as arrays with NumPy
+        self.terms: Dict[str, Tuple[Any, Any]] = {}
+        for term, freqs in postings.items():
+            idf = math.log(1 + (n - len(freqs) + 0.5) / (len(freqs) + 0.5))
+            rels = sorted(freqs, key=position.__getitem__)
+            positions = [position[rel] for rel in rels]
+            weights = [
+                idf * freqs[rel] * (BM25_K1 + 1) / (freqs[rel] + norm[rel])
+                for rel in rels
+            ]
+            if np is not None:
+                self.terms[term] = (
+                    np.array(positions, dtype=np.intp),
+                    np.array(weights, dtype=np.float64),
+                )
+            else:
+                self.terms[term] = (positions, weights)
+
+    def top(self, terms: Iterable[str], limit: int) -> List[str]:
+        """Ids of the best-scoring sections with a positive score."""
+        # Terms are added in a fixed order so both paths sum scores alike
+        vectors = [self.terms[t] for t in sorted(set(terms)) if t in self.terms]
+        if not vectors or limit <= 0:
+            return []
+        if np is not None:
+            scores = np.zeros(len(self.ids))
+            for positions, weights in vectors:
+                # A term lists each section once, so this cannot collide
+                scores[positions] += weights
+            hits = np.flatnonzero(scores > 0)
+            if len(hits) > limit:
+                # Keep every section tied with the last one that makes it,
+                # so ties are broken by position below and not arbitrarily
+                cutoff = -np.partition(-scores[hits], limit - 1)[limit - 1]
+                hits = hits[scores[hits] >= cutoff]
+            # Positions break ties; lexsort sorts by its last key first
+            order = hits[np.lexsort((hits, -scores[hits]))][:limit]
+            return [self.ids[i] for i in order.tolist()]
+        totals: Dict[int, float] = {}
+        for positions, weights in vectors:
+            for i, w in zip(positions, weights):
+                totals[i] = totals.get(i, 0.0) + w
+        best = heapq.nsmallest(limit, totals.items(), key=lambda t: (-t[1], t[0]))
+        return [self.ids[i] for i, score in best if score > 0]
+
+
+class DocsIndex:
+    """Inverted index of the sections of the .rst files under a docs root.
+
+    With a path, the index is loaded from and saved to that JSON file;
+    without one it lives in memory only. The index refreshes itself on first
+    use and is then safe to search from any number of threads. Failures to
+    save are ignored: the index can always be rebuilt from the docs.
+    """
+
+    def __init__(self, root: Path, path: Optional[Path] = None) -> None:
+        self.root = Path(root)
+        self.path = None if path is None else Path(path)
+        self.docs: Dict[str, DocEntry] = {}
+        self.sections: Dict[str, Section] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._fresh = False
+        self._ranker: Optional[_Ranker] = None
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != DOCS_INDEX_VERSION
+            or data.get("root") != str(self.root.resolve())
+        ):
+            return
+        try:
+            self.docs = {
+                rel: DocEntry(rel, *fields) for rel, fields in data["docs"].items()
+            }
+            self.sections = {
+                sid: Section(sid, *fields)
+                for sid, fields in data["sections"].items()
+            }
+            self.postings = data["postings"]
+        except (KeyError, TypeError, AttributeError):
+            self.docs, self.sections, self.postings = {}, {}, {}
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        data = {
+            "version": DOCS_INDEX_VERSION,
+            "root": str(self.root.resolve()),
+            "docs": {
+                rel: [e.mtime_ns, e.size, e.sections] for rel, e in self.docs.items()
+            },
+            "sections": {
+                sid: [e.path, e.title, e.length, e.text]
+                for sid, e in self.sections.items()
+            },
+            "postings": self.postings,
+        }
+        tmp_path = self.path.with_name(
+            f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            tmp_path.replace(self.path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def refresh(self) -> int:
+        """Re-read new and changed files, drop deleted ones and save.
+
+        Returns the number of files that were read.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> int:
+        if not self._loaded:
+            self._load()
+        changed: List[Tuple[str, Path, os.stat_result]] = []
+        seen = set()
+        if self.root.is_dir():
+            for p in sorted(self.root.rglob("*.rst")):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                rel = p.relative_to(self.root).as_posix()
+                seen.add(rel)
+                entry = self.docs.get(rel)
+                if (
+                    entry is None
+                    or entry.mtime_ns != st.st_mtime_ns
+                    or entry.size != st.st_size
+                ):
+                    changed.append((rel, p, st))
+
+        stale = (set(self.docs) - seen) | {rel for rel, _, _ in changed}
+        if stale:
+            stale_ids = {
+                f"{rel}#{n}"
+                for rel in stale
+                if rel in self.docs
+                for n in range(self.docs[rel].sections)
+            }
+            for term in list(self.postings):
+                sections = self.postings[term]
+                for sid in stale_ids.intersection(sections):
+                    del sections[sid]
+                if not sections:
+                    del self.postings[term]
+            for sid in stale_ids:
+                self.sections.pop(sid, None)
+            for rel in stale:
+                self.docs.pop(rel, None)
+
+        for rel, p, st in changed:
+            doc_title = doc_title_from_path(p)
+            sections = split_sections(read_text_safe(p))
+            for n, (heading, body) in enumerate(sections):
+                sid = f"{rel}#{n}"
+                # The section title is part of what the section is about
+                counts = Counter(tokenize(f"{heading}\n{body}"))
+                for term, count in counts.items():
+                    self.postings.setdefault(term, {})[sid] = count
+                self.sections[sid] = Section(
+                    sid,
+                    rel,
+                    _section_title(doc_title, heading),
+                    sum(counts.values()),
+                    body[:SNIPPET_CHARS],
+                )
+            self.docs[rel] = DocEntry(rel, st.st_mtime_ns, st.st_size, len(sections))
+
+        if stale:
+            self._save()
+            self._ranker = None
+        self._fresh = True
+        return len(changed)
+
+    def search(self, tokens: Iterable[str], limit: int = 8) -> List[Section]:
+        """Sections ranked by BM25 against the distinct tokens, best first."""
+        ranker = self._ranker
+        if ranker is None or not self._fresh:
+            with self._lock:
+                if not self._fresh:
+                    self._refresh()
+                if self._ranker is None:
+                    self._ranker = _Ranker(
+                        {sid: e.length for sid, e in self.sections.items()},
+                        self.postings,
+                    )
+                ranker = self._ranker
+        return [self.sections[sid] for sid in ranker.top(tokens, limit)]
@@ -0,0 +1,158 @@
+"""Thread-safe Ollama client with connection reuse and retries.
+
+One OllamaClient is shared by every description request of a run. It keeps
+a small pool of persistent HTTP connections, so requests reuse keep-alive
+sockets instead of opening a new one each time. The pool size is also the
+concurrency limit: a request waits until a connection is free. Failed
+requests (connection errors, timeouts, 429 and 5xx replies) are retried
+with exponential backoff and full jitter.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import queue
+import random
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 60.0  # Seconds per request attempt
+DEFAULT_RETRIES = 3  # Attempts after the first one
+
+_RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class _RetryableError(Exception):
+    pass
+
+
+class OllamaClient:
+    """Calls Ollama's /api/generate from any number of threads."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        parsed = urllib.parse.urlsplit(base_url.rstrip("/"))
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Unsupported Ollama URL: {base_url}")
+        self._https = parsed.scheme == "https"
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._path = parsed.path + "/api/generate"
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # None marks a slot whose connection is opened on first use
+        self._pool: "queue.LifoQueue[Optional[http.client.HTTPConnection]]"
+        self._pool = queue.LifoQueue()
+        for _ in range(concurrency):
+            self._pool.put(None)
+        self._random = random.Random()
+        self._lock = threading.Lock()
+        self._open: List[http.client.HTTPConnection] = []
+
+    def _connect(self, timeout: float) -> http.client.HTTPConnection:
+        conn: http.client.HTTPConnection
+        if self._https:
+            conn = http.client.HTTPSConnection(self._host, self._port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+        with self._lock:
+            self._open.append(conn)
+        return conn
+
+    def _discard(self, conn: Optional[http.client.HTTPConnection]) -> None:
+        if conn is None:
+            return
+        conn.close()
+        with self._lock:
+            if conn in self._open:
+                self._open.remove(conn)
+
+    def _delay(self, attempt: int) -> float:
+        with self._lock:
+            return self._random.uniform(
+                0, min(self.max_backoff, self.backoff * 2**attempt)
+            )
+
+    def _post(
+        self, conn: http.client.HTTPConnection, body: bytes, timeout: float
+    ) -> Dict[str, Any]:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        conn.request(
+            "POST",
+            self._path,
+            body=body,
+            headers={"Content-Type": "application/json", "Connection": "keep-alive"},
+        )
+        resp = conn.getresponse()
+        # Always drain the body so the connection can be reused
+        data = resp.read()
+        if resp.status in _RETRY_STATUSES:
+            raise _RetryableError(f"HTTP {resp.status}")
+        if resp.status != 200:
+            raise ValueError(f"HTTP {resp.status}")
+        if resp.will_close:
+            conn.close()
+        return json.loads(data.decode("utf-8"))
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[str]:
+        """Return the model's reply, or None if every attempt failed."""
+        payload = {"model": model, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+        body = json.dumps(payload).encode("utf-8")
+        timeout = self.timeout if timeout is None else timeout
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self._delay(attempt - 1))
+            conn = self._pool.get()
+            try:
+                if conn is None:
+                    conn = self._connect(timeout)
+                out = self._post(conn, body, timeout)
+            except (_RetryableError, OSError, http.client.HTTPException):
+                # The connection may be half-used; start the next try afresh
+                self._discard(conn)
+                conn = None
+                continue
+            except ValueError:
+                # Client errors and malformed replies will not improve
+                self._discard(conn)
+                conn = None
+                return None
+            finally:
+                self._pool.put(conn)
+            return str(out.get("response", "")).strip() or None
+        return None
+
+    def close(self) -> None:
+        """Close every open connection; the client stays usable."""
+        with self._lock:
+            conns, self._open = self._open, []
+        for conn in conns:
+            conn.close()
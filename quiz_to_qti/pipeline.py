@@ -0,0 +1,125 @@
+"""Staged pipeline over bounded queues.
+
+Items flow through the stages in order, each stage run by its own worker
+threads, so an item moves on as soon as it is done with a stage instead of
+waiting for every other item to finish it. The first result is ready after
+one pass through the stages, and total time approaches that of the slowest
+stage rather than the sum of all of them. Queues between stages are bounded:
+a fast stage waits for a slow one instead of piling up work.
+
+An item whose stage raises skips the remaining stages and comes out with
+the exception attached. Results come out in completion order.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+# Marks the end of the input on a queue; one is sent per consumer
+_DONE = object()
+
+
+@dataclass(slots=True)
+class Stage:
+    """One step of a pipeline: func maps an item's value to its next value."""
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass(slots=True)
+class PipelineResult:
+    """What came out of the pipeline for one input item."""
+
+    index: int
+    value: Any
+    error: Optional[BaseException] = None
+    stage: Optional[str] = None  # Name of the stage that raised
+
+
+def run_pipeline(
+    items: Iterable[Any], stages: Sequence[Stage], *, maxsize: Optional[int] = None
+) -> Iterator[PipelineResult]:
+    """Run items through stages, yielding each result as it completes.
+
+    Each queue between stages holds at most ``maxsize`` items (by default
+    twice the workers of the stage reading it). Input is read lazily, so
+    items can come from a generator that is still discovering them.
+    Closing the iterator early stops the workers after their current item.
+    """
+    if not stages:
+        raise ValueError("A pipeline needs at least one stage")
+    stop = threading.Event()
+    queues: List["queue.Queue[Any]"] = [
+        queue.Queue(maxsize if maxsize is not None else 2 * max(1, stage.workers))
+        for stage in stages
+    ]
+    # Results are never held back: the consumer may be slow to read them
+    queues.append(queue.Queue())
+    consumers = [max(1, stage.workers) for stage in stages] + [1]
+
+    def feed() -> None:
+        try:
+            for index, item in enumerate(items):
+                if stop.is_set():
+                    break
+                queues[0].put(PipelineResult(index, item))
+        except BaseException as e:  # A failing input ends the run with its error
+            queues[0].put(PipelineResult(-1, None, e, "input"))
+        finally:
+            for _ in range(consumers[0]):
+                queues[0].put(_DONE)
+
+    def work(
+        position: int, stage: Stage, remaining: List[int], lock: threading.Lock
+    ) -> None:
+        inbox, outbox = queues[position], queues[position + 1]
+        while True:
+            job = inbox.get()
+            if job is _DONE:
+                break
+            if job.error is None:
+                if stop.is_set():
+                    job.error, job.stage = RuntimeError("Pipeline stopped"), stage.name
+                else:
+                    try:
+                        job.value = stage.func(job.value)
+                    except Exception as e:
+                        job.error, job.stage = e, stage.name
+            outbox.put(job)
+        # The last worker of a stage to finish ends the next stage's input
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(consumers[position + 1]):
+                outbox.put(_DONE)
+
+    threads = [threading.Thread(target=feed, name="pipeline-input", daemon=True)]
+    for position, stage in enumerate(stages):
+        remaining, lock = [consumers[position]], threading.Lock()
+        for n in range(consumers[position]):
+            threads.append(
+                threading.Thread(
+                    target=work,
+                    args=(position, stage, remaining, lock),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                )
+            )
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            job = queues[-1].get()
+            if job is _DONE:
+                break
+            yield job
+    finally:
+        # Workers skip the stages of whatever is still queued and drain out
+        stop.set()
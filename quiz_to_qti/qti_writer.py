@@ -0,0 +1,332 @@
+"""In-process QTI writer.
+
+Builds the Canvas-importable QTI 1.2 zip straight from parsed
+QuizdownQuestion objects, without writing text2qti plaintext and running the
+text2qti command on it. text2qti's Markdown renderer and XML templates are
+reused, and identifiers are hashed the same way, so the package matches what
+``text2qti quiz.txt`` produces for the same quiz.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from text2qti import xml_assessment as t2q_xml
+from text2qti.config import Config
+from text2qti.err import Text2qtiError
+from text2qti.markdown import Markdown
+from text2qti.xml_assessment_meta import assessment_meta
+from text2qti.xml_imsmanifest import imsmanifest
+
+from .converter import QuizdownQuestion, iter_quizdown_files
+
+_ID_BASE = "text2qti"
+_TRUE_FALSE = ("true", "True", "false", "False")
+
+
+@dataclass(slots=True)
+class _Choice:
+    correct: bool
+    ident: str
+    html_xml: str
+    feedback_html_xml: Optional[str]
+
+
+def load_config(pandoc_mathml: bool = False) -> Config:
+    """text2qti configuration as the text2qti command would load it."""
+    config = Config()
+    config.load()
+    if pandoc_mathml:
+        config["pandoc_mathml"] = True
+    return config
+
+
+def _points(points: Optional[float]) -> Union[int, float]:
+    if points is None:
+        return 1
+    value = float(points)
+    if value <= 0 or (not value.is_integer() and abs(value - round(value)) != 0.5):
+        raise Text2qtiError(
+            f'Invalid points value "{points:g}"; need positive integer or half-integer'
+        )
+    return int(value) if value.is_integer() else value
+
+
+def _feedback_xml(
+    render: Callable[[str], str], feedback: Optional[str]
+) -> Optional[str]:
+    # Multi-line feedback is one Markdown text, as an indented
+    # continuation would be in text2qti plaintext
+    if not feedback:
+        return None
+    return render(feedback.strip())
+
+
+def _question_xml(
+    md: Markdown, render: Callable[[str], str], q: QuizdownQuestion
+) -> Tuple[bytes, str]:
+    """Render one question as an assessment item; returns (digest, xml)."""
+    question_html_xml = render(q.prompt_md.strip())
+    h = hashlib.blake2b(question_html_xml.encode("utf8"))
+    digest = h.digest()
+    qid = h.hexdigest()[:64]
+    title_xml = "Question" if q.title is None else md.xml_escape(q.title)
+    points = _points(q.points)
+    general_feedback_xml = _feedback_xml(render, q.general_feedback_md)
+
+    choices: List[_Choice] = []
+    seen: Set[str] = set()
+    for is_correct, text, fb in q.choices:
+        html_xml = render(text.strip())
+        if html_xml in seen:
+            raise Text2qtiError("Duplicate choice")
+        seen.add(html_xml)
+        cid = hashlib.blake2b(html_xml.encode("utf8"), key=digest).hexdigest()[:64]
+        feedback_xml = _feedback_xml(render, fb)
+        ident = f"text2qti_choice_{cid}"
+        choices.append(_Choice(is_correct, ident, html_xml, feedback_xml))
+
+    correct = sum(1 for c in choices if c.correct)
+    if not choices:
+        question_type = "essay_question"
+    elif correct > 1:
+        question_type = "multiple_answers_question"
+    else:
+        if len(choices) < 2:
+            raise Text2qtiError("Question must provide more than one choice")
+        if not correct:
+            raise Text2qtiError("Question must specify a correct choice")
+        question_type = "multiple_choice_question"
+        if len(choices) == 2 and all(
+            text.strip() in _TRUE_FALSE for _, text, _ in q.choices
+        ):
+            question_type = "true_false_question"
+
+    xml = [
+        t2q_xml.START_ITEM.format(
+            question_identifier=f"text2qti_question_{qid}", question_title=title_xml
+        ),
+        (
+            t2q_xml.ITEM_METADATA_ESSAY
+            if question_type == "essay_question"
+            else t2q_xml.ITEM_METADATA_MCTF_SHORTANS_MULTANS_NUM
+        ).format(
+            question_type=question_type,
+            points_possible=points,
+            original_answer_ids=",".join(c.ident for c in choices),
+            assessment_question_identifierref=f"text2qti_question_ref_{qid}",
+        ),
+    ]
+
+    if question_type == "essay_question":
+        xml.append(
+            t2q_xml.ITEM_PRESENTATION_ESSAY.format(question_html_xml=question_html_xml)
+        )
+        xml.append(t2q_xml.ITEM_RESPROCESSING_START)
+        xml.append(t2q_xml.ITEM_RESPROCESSING_ESSAY)
+        if general_feedback_xml is not None:
+            xml.append(t2q_xml.ITEM_RESPROCESSING_ESSAY_GENERAL_FEEDBACK)
+        xml.append(t2q_xml.ITEM_RESPROCESSING_END)
+    else:
+        multiple = question_type == "multiple_answers_question"
+        presentation = (
+            t2q_xml.ITEM_PRESENTATION_MULTANS
+            if multiple
+            else t2q_xml.ITEM_PRESENTATION_MCTF
+        )
+        presentation_choice = (
+            t2q_xml.ITEM_PRESENTATION_MULTANS_CHOICE
+            if multiple
+            else t2q_xml.ITEM_PRESENTATION_MCTF_CHOICE
+        )
+        xml.append(
+            presentation.format(
+                question_html_xml=question_html_xml,
+                choices="\n".join(
+                    presentation_choice.format(
+                        ident=c.ident, choice_html_xml=c.html_xml
+                    )
+                    for c in choices
+                ),
+            )
+        )
+
+        xml.append(t2q_xml.ITEM_RESPROCESSING_START)
+        if general_feedback_xml is not None:
+            xml.append(t2q_xml.ITEM_RESPROCESSING_MCTF_GENERAL_FEEDBACK)
+        for c in choices:
+            if c.feedback_html_xml is not None:
+                choice_feedback = t2q_xml.ITEM_RESPROCESSING_MCTF_CHOICE_FEEDBACK
+                xml.append(choice_feedback.format(ident=c.ident))
+        if multiple:
+            right = t2q_xml.ITEM_RESPROCESSING_MULTANS_SET_CORRECT_VAREQUAL_CORRECT
+            wrong = t2q_xml.ITEM_RESPROCESSING_MULTANS_SET_CORRECT_VAREQUAL_INCORRECT
+            varequal = "\n".join(
+                (right if c.correct else wrong).format(ident=c.ident)
+                for c in choices
+            )
+            xml.append(
+                t2q_xml.ITEM_RESPROCESSING_MULTANS_SET_CORRECT_NO_FEEDBACK.format(
+                    varequal=varequal
+                )
+            )
+        else:
+            correct_choice = next(c for c in choices if c.correct)
+            xml.append(
+                t2q_xml.ITEM_RESPROCESSING_MCTF_SET_CORRECT_NO_FEEDBACK.format(
+                    ident=correct_choice.ident
+                )
+            )
+        xml.append(t2q_xml.ITEM_RESPROCESSING_END)
+
+    if general_feedback_xml is not None:
+        xml.append(
+            t2q_xml.ITEM_FEEDBACK_MCTF_SHORTANS_MULTANS_NUM_GENERAL.format(
+                feedback=general_feedback_xml
+            )
+        )
+    for c in choices:
+        if c.feedback_html_xml is not None:
+            xml.append(
+                t2q_xml.ITEM_FEEDBACK_MCTF_SHORTANS_MULTANS_NUM_INDIVIDUAL.format(
+                    ident=c.ident, feedback=c.feedback_html_xml
+                )
+            )
+    xml.append(t2q_xml.END_ITEM)
+    return digest, "".join(xml)
+
+
+def write_qti_zip(
+    questions: Iterable[QuizdownQuestion],
+    zip_path: Path,
+    *,
+    title: str,
+    description: Optional[str] = None,
+    shuffle_answers: bool = True,
+    show_correct: bool = True,
+    config: Optional[Config] = None,
+) -> Path:
+    """Write questions as a QTI zip that Canvas can import.
+
+    Questions are rendered as they are consumed, so only their XML is kept
+    until the package is written. Problems text2qti would reject (duplicate
+    questions or choices, no correct choice) raise Text2qtiError naming the
+    question. Relative image paths resolve against the working directory.
+    The zip is written to a temporary file first and then moved into place.
+    """
+    md = Markdown(config if config is not None else load_config())
+    # Markdown conversion dominates; repeated texts ("Correct!", "True")
+    # are converted once per quiz
+    rendered: Dict[str, str] = {}
+
+    def render(text: str) -> str:
+        html_xml = rendered.get(text)
+        if html_xml is None:
+            html_xml = rendered[text] = md.md_to_html_xml(text)
+        return html_xml
+
+    try:
+        items: List[str] = []
+        digests: List[bytes] = []
+        seen: Set[bytes] = set()
+        points_possible: Union[int, float] = 0
+        for index, q in enumerate(questions, start=1):
+            try:
+                digest, item_xml = _question_xml(md, render, q)
+                if digest in seen:
+                    raise Text2qtiError("Duplicate question")
+            except Text2qtiError as e:
+                raise Text2qtiError(f"Question {index}: {e}") from e
+            seen.add(digest)
+            digests.append(digest)
+            items.append(item_xml)
+            points_possible += _points(q.points)
+        if not items:
+            raise Text2qtiError("No questions were found")
+
+        h = hashlib.blake2b()
+        for digest in sorted(digests):
+            h.update(digest)
+        quiz_id = h.hexdigest()[:64]
+        assessment_id = f"{_ID_BASE}_assessment_{quiz_id}"
+        title_xml = md.xml_escape(title.strip())
+
+        manifest_xml = imsmanifest(
+            manifest_identifier=f"{_ID_BASE}_manifest_{quiz_id}",
+            assessment_identifier=assessment_id,
+            dependency_identifier=f"{_ID_BASE}_dependency_{quiz_id}",
+            images=md.images,
+        )
+        meta_xml = assessment_meta(
+            assessment_identifier=assessment_id,
+            assignment_identifier=f"{_ID_BASE}_assignment_{quiz_id}",
+            assignment_group_identifier=f"{_ID_BASE}_assignment-group_{quiz_id}",
+            title_xml=title_xml,
+            description_html_xml=(
+                render(description.strip()) if description else ""
+            ),
+            points_possible=points_possible,
+            shuffle_answers="true" if shuffle_answers else "false",
+            show_correct_answers="true" if show_correct else "false",
+            one_question_at_a_time="false",
+            cant_go_back="false",
+        )
+
+        tmp_path = zip_path.with_name(
+            f"{zip_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr("imsmanifest.xml", manifest_xml)
+                zf.writestr(zipfile.ZipInfo("non_cc_assessments/"), b"")
+                zf.writestr(f"{assessment_id}/assessment_meta.xml", meta_xml)
+                with zf.open(f"{assessment_id}/{assessment_id}.xml", "w") as fh:
+                    fh.write(
+                        t2q_xml.BEFORE_ITEMS.format(
+                            assessment_identifier=assessment_id, title=title_xml
+                        ).encode("utf8")
+                    )
+                    for item_xml in items:
+                        fh.write(item_xml.encode("utf8"))
+                    fh.write(t2q_xml.AFTER_ITEMS.encode("utf8"))
+                for image in md.images.values():
+                    zf.writestr(image.qti_zip_path, image.data)
+            tmp_path.replace(zip_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    finally:
+        md.finalize()
+    return zip_path
+
+
+def build_qti_zip(
+    files: Iterable[Path],
+    zip_path: Path,
+    *,
+    title: str,
+    description: Optional[str] = None,
+    shuffle_answers: bool = True,
+    show_correct: bool = True,
+    config: Optional[Config] = None,
+) -> Path:
+    """Parse and merge Quizdown files straight into one QTI zip.
+
+    The in-process counterpart of convert_quizdown_files followed by the
+    text2qti command: questions stream from the input files into the writer
+    and no plaintext is written.
+    """
+    return write_qti_zip(
+        iter_quizdown_files(files),
+        zip_path,
+        title=title,
+        description=description,
+        shuffle_answers=shuffle_answers,
+        show_correct=show_correct,
+        config=config,
+    )
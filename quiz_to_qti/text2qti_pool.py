@@ -0,0 +1,192 @@
+"""Persistent text2qti worker pool.
+
+Running the text2qti command once per quiz starts a fresh interpreter and
+imports text2qti (and Python-Markdown) every time. A Text2qtiPool keeps a few
+worker processes that import text2qti once and then convert text2qti
+plaintext files sent to them over a pipe, exactly as the command would.
+
+Each job has a timeout; a worker that times out or dies is killed and
+replaced, and only the job it was running fails.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+from multiprocessing.connection import Connection
+from pathlib import Path
+from types import TracebackType
+from typing import Any, List, Optional, Tuple, Type
+
+from text2qti.err import Text2qtiError
+
+DEFAULT_TIMEOUT = 300.0  # Seconds one quiz may take before its worker is killed
+
+# Spawned workers are safe to start from threads, unlike forked ones
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _worker_main(conn: Connection) -> None:
+    """Worker loop: convert each plaintext path received until told to stop."""
+    from text2qti.qti import QTI
+    from text2qti.quiz import Quiz
+
+    from .qti_writer import load_config
+
+    config = load_config()
+    cwd = os.getcwd()
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        result: Tuple[str, str]
+        try:
+            txt_path = Path(job)
+            text = txt_path.read_text(encoding="utf-8-sig")
+            # Like the text2qti command, resolve relative paths (images)
+            # against the plaintext file's folder
+            os.chdir(txt_path.parent)
+            quiz = Quiz(text, config=config, source_name=txt_path.as_posix())
+            zip_path = txt_path.with_suffix(".zip")
+            QTI(quiz).save(zip_path.name)
+            result = ("ok", str(zip_path))
+        except Text2qtiError as e:
+            result = ("error", str(e))
+        except Exception as e:
+            result = ("error", f"{type(e).__name__}: {e}")
+        finally:
+            os.chdir(cwd)
+        conn.send(result)
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe."""
+
+    __slots__ = ("process", "conn")
+
+    def __init__(self) -> None:
+        self.process: Optional[Any] = None
+        self.conn: Optional[Connection] = None
+
+    def ensure_started(self) -> Connection:
+        if self.process is None or not self.process.is_alive():
+            self.kill()
+            parent_conn, child_conn = _CONTEXT.Pipe()
+            self.process = _CONTEXT.Process(
+                target=_worker_main, args=(child_conn,), daemon=True
+            )
+            self.process.start()
+            child_conn.close()
+            self.conn = parent_conn
+        assert self.conn is not None
+        return self.conn
+
+    def kill(self) -> Optional[int]:
+        """Stop the process if running; returns its exit code."""
+        code = None
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join()
+            code = self.process.exitcode
+            self.process.close()
+            self.process = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        return code
+
+    def stop(self) -> None:
+        """Ask the worker to exit after its current job, then reap it."""
+        if self.process is not None and self.conn is not None:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=5)
+        self.kill()
+
+
+class Text2qtiPool:
+    """A fixed number of warm text2qti workers shared by any number of threads.
+
+    convert() blocks until a worker is free, so a ThreadPoolExecutor with as
+    many threads as workers keeps them all busy. Use the pool as a context
+    manager, or call close() when done.
+    """
+
+    def __init__(self, workers: int = 2, timeout: Optional[float] = DEFAULT_TIMEOUT):
+        if workers < 1:
+            raise ValueError("A text2qti pool needs at least one worker")
+        self.timeout = timeout
+        self._workers: List[_Worker] = [_Worker() for _ in range(workers)]
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        # Start every worker now so their imports overlap with other work
+        for worker in self._workers:
+            worker.ensure_started()
+            self._idle.put(worker)
+
+    @property
+    def workers(self) -> int:
+        return len(self._workers)
+
+    def __enter__(self) -> Text2qtiPool:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def convert(self, txt_path: Path) -> Path:
+        """Convert a text2qti plaintext file into the zip next to it.
+
+        Raises Text2qtiError if text2qti rejects the quiz, the job times out
+        or the worker dies. Timed-out and crashed workers are replaced.
+        """
+        if self._closed:
+            raise RuntimeError("Text2qtiPool is closed")
+        worker = self._idle.get()
+        try:
+            try:
+                conn = worker.ensure_started()
+                conn.send(str(txt_path.resolve()))
+            except OSError as e:
+                worker.kill()
+                raise Text2qtiError(f"text2qti worker failed on {txt_path.name}: {e}")
+            if not conn.poll(self.timeout):
+                worker.kill()
+                raise Text2qtiError(
+                    f"text2qti timed out after {self.timeout:g} s on {txt_path.name}"
+                )
+            try:
+                status, value = conn.recv()
+            except (EOFError, OSError):
+                code = worker.kill()
+                raise Text2qtiError(
+                    f"text2qti worker crashed on {txt_path.name} (exit code {code})"
+                )
+        finally:
+            self._idle.put(worker)
+        if status != "ok":
+            raise Text2qtiError(value)
+        return Path(value)
+
+    def close(self) -> None:
+        """Stop all workers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for worker in self._workers:
+            worker.stop()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the RST to HTML pipeline
+
+Measures RSTConverter.convert_single_file, HTMLProcessor.process_html and
+PygmentsProcessor.process_html_code_blocks on the real documentation tree and
+on a generated corpus of large pages. Results are compared with a stored
+baseline so performance work can be measured and regressions caught.
+
+Usage:
+
+    python -m rst_to_html.benchmark
+    python -m rst_to_html.benchmark --save-baseline
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+import click
+from docutils import nodes
+from docutils.core import publish_string
+from docutils.writers.html5_polyglot import HTMLTranslator, Writer
+
+from .config import Config
+from .converter import RSTConverter
+from .file_utils import FileUtils
+from .html_processor import HTMLProcessor
+from .html_writer import CanvasHTMLTranslator, CanvasHTMLWriter
+from .pygments_processor import create_pygments_processor
+from .sphinx_directives import register_sphinx_directives
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+
+DEFAULT_THRESHOLD = 0.25  # Relative slowdown reported as a regression
+
+
+@dataclass
+class BenchmarkResult:
+    """Throughput and memory of one benchmark"""
+
+    name: str
+    pages: int
+    bytes: int  # Input size processed per run
+    seconds: float  # Best wall time over the repeats
+    peak_memory: int  # Peak traced allocation during one run, in bytes
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1_048_576 / self.seconds if self.seconds else 0.0
+
+
+# Building blocks of the synthetic corpus, modeled on the documentation
+_ADMONITIONS = ["note", "tip", "warning", "important", "seealso", "caution"]
+
+_TERMS = ["servo motor", "PWM", "breadboard", "microcontroller", "sensor"]
+
+_REFS = ["loops", "functions", "variables", "arrays", "control_structures"]
+
+
+def _code_block(rng: random.Random, index: int) -> str:
+    pin = rng.randint(2, 13)
+    limit = rng.randint(5, 200)
+    return (
+        ".. code-block:: cpp\n"
+        "\n"
+        f"   const int pin{index} = {pin};\n"
+        "\n"
+        "   void setup() {\n"
+        f"     pinMode(pin{index}, OUTPUT);\n"
+        "     Serial.begin(9600);\n"
+        "   }\n"
+        "\n"
+        "   void loop() {\n"
+        f"     for (int i = 0; i < {limit}; i++) {{\n"
+        f'       digitalWrite(pin{index}, i % 2 == 0 ? HIGH : LOW);  // "blink"\n'
+        f"       delay({rng.randint(10, 500)});\n"
+        "     }\n"
+        "   }\n"
+    )
+
+
+def _section(rng: random.Random, index: int) -> str:
+    term = rng.choice(_TERMS)
+    ref = rng.choice(_REFS)
+    parts = [
+        f"Section {index}\n{'-' * (8 + len(str(index)))}\n",
+        f"This part uses a :term:`{term}` together with ``digitalWrite`` and "
+        f"builds on :ref:`{ref.replace('_', ' ').title()} <{ref}>` and :ref:`{ref}`.\n",
+    ]
+
+    kind = index % 4
+    if kind == 0:
+        admonition = rng.choice(_ADMONITIONS)
+        parts.append(
+            f".. {admonition}::\n\n"
+            f"   Remember that the :term:`{term}` needs power. Check the wiring\n"
+            f"   before calling ``analogWrite(pin, {rng.randint(0, 255)})``.\n"
+        )
+    elif kind == 1:
+        parts.append(_code_block(rng, index))
+    elif kind == 2:
+        rows = "\n".join(
+            f"   * - Pin {row}\n     - ``{rng.choice(['INPUT', 'OUTPUT'])}``\n"
+            f"     - {rng.randint(0, 1023)}"
+            for row in range(rng.randint(3, 8))
+        )
+        parts.append(
+            ".. list-table:: Pin usage\n"
+            "   :header-rows: 1\n\n"
+            "   * - Pin\n     - Mode\n     - Reading\n"
+            f"{rows}\n"
+        )
+    else:
+        code = _code_block(rng, index).split("\n", 2)[2]
+        parts.append(f".. whole-code-block:: arduino\n\n{code}")
+
+    return "\n".join(parts)
+
+
+def generate_corpus(
+    directory: Path, pages: int = 4, sections: int = 800, seed: int = 0
+) -> list[Path]:
+    """Write a deterministic corpus of large RST pages.
+
+    Every page mixes admonitions, code blocks, tables, whole code blocks and
+    :ref:/:term: roles in equal measure. Each section adds one of the four
+    blocks, so the default 800 sections give 200 of each per page.
+    """
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    files = []
+    for page in range(pages):
+        title = f"Synthetic Page {page}"
+        body = "\n".join(_section(rng, index) for index in range(sections))
+        path = directory / f"page_{page:03d}.rst"
+        path.write_text(f"{title}\n{'=' * len(title)}\n\n{body}", encoding="utf-8")
+        files.append(path)
+    return files
+
+
+def _measure(
+    name: str, pages: int, size: int, run: Callable[[], None], repeat: int
+) -> BenchmarkResult:
+    """Time a benchmark, then measure its peak memory in a separate run"""
+    # Warm-up: imports, lexers, compiled patterns
+    run()
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # tracemalloc slows everything down, so it never overlaps timed runs
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(name, pages, size, best, peak)
+
+
+class _PlainCodeTranslator(CanvasHTMLTranslator):
+    """Leaves code blocks as docutils renders them, without highlighting"""
+
+    def visit_literal_block(self, node: nodes.literal_block) -> None:
+        HTMLTranslator.visit_literal_block(self, node)
+
+
+class _PlainCodeWriter(Writer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.translator_class = _PlainCodeTranslator
+
+
+def render_pages(files: list[Path], writer_class: Callable[[], Writer]) -> list[str]:
+    """Raw docutils HTML of each file, before post-processing"""
+    settings = Config().docutils_settings
+    pages = []
+    for path in files:
+        html = publish_string(
+            path.read_text(encoding="utf-8"),
+            source_path=str(path),
+            writer=writer_class(),
+            settings_overrides=settings,
+        )
+        pages.append(html.decode("utf-8") if isinstance(html, bytes) else html)
+    return pages
+
+
+def bench_convert(
+    name: str, source_dir: Path, files: list[Path], repeat: int
+) -> BenchmarkResult:
+    """End-to-end conversion of every file through convert_single_file"""
+    size = sum(path.stat().st_size for path in files)
+    with tempfile.TemporaryDirectory() as output:
+        config = Config(
+            source_dir=source_dir, output_dir=Path(output), highlight_cache=False
+        )
+        converter = RSTConverter(config)
+        jobs = [
+            (path, FileUtils.calculate_relative_path(path, source_dir, Path(output)))
+            for path in files
+        ]
+
+        def run() -> None:
+            for input_file, output_file in jobs:
+                converter.convert_single_file(input_file, output_file)
+
+        return _measure(name, len(files), size, run, repeat)
+
+
+def bench_process_html(
+    name: str, files: list[Path], repeat: int
+) -> BenchmarkResult:
+    """HTMLProcessor.process_html on the writer's output of every file"""
+    pages = render_pages(files, CanvasHTMLWriter)
+    processor = HTMLProcessor()
+
+    def run() -> None:
+        for html in pages:
+            processor.process_html(html)
+
+    return _measure(name, len(pages), sum(len(p.encode()) for p in pages), run, repeat)
+
+
+def bench_code_blocks(
+    name: str, files: list[Path], repeat: int
+) -> BenchmarkResult:
+    """PygmentsProcessor.process_html_code_blocks on unhighlighted HTML"""
+    pages = render_pages(files, _PlainCodeWriter)
+    processor = create_pygments_processor()
+
+    def run() -> None:
+        for html in pages:
+            processor.process_html_code_blocks(html)
+
+    return _measure(name, len(pages), sum(len(p.encode()) for p in pages), run, repeat)
+
+
+def run_benchmarks(
+    docs_dir: Path, corpus_pages: int, corpus_sections: int, repeat: int
+) -> list[BenchmarkResult]:
+    """Run every benchmark on the docs tree and on a generated corpus"""
+    register_sphinx_directives()
+    results = []
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        corpus = generate_corpus(Path(corpus_dir), corpus_pages, corpus_sections)
+        # The corpus size is part of the name so baselines only compare like runs
+        suites = [
+            (f"corpus-{corpus_pages}x{corpus_sections}", Path(corpus_dir), corpus)
+        ]
+        if docs_dir.exists():
+            suites.insert(0, ("docs", docs_dir, FileUtils.find_rst_files(docs_dir)))
+
+        # Conversion prints per-file progress; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for suite, source_dir, files in suites:
+                results.append(
+                    bench_convert(f"{suite}/convert", source_dir, files, repeat)
+                )
+                results.append(
+                    bench_process_html(f"{suite}/process_html", files, repeat)
+                )
+                results.append(bench_code_blocks(f"{suite}/code_blocks", files, repeat))
+
+    return results
+
+
+def load_baseline(path: Path) -> dict[str, BenchmarkResult]:
+    """Read stored results, keyed by benchmark name"""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {
+        entry["name"]: BenchmarkResult(**entry) for entry in data.get("results", [])
+    }
+
+
+def write_baseline(path: Path, results: list[BenchmarkResult]) -> None:
+    """Store results as the new baseline"""
+    data = {
+        "python": sys.version.split()[0],
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def format_report(
+    results: list[BenchmarkResult],
+    baseline: dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> tuple[str, list[str]]:
+    """Render the results table and list benchmarks slower than the baseline"""
+    lines = [
+        f"{'Benchmark':<28}{'Pages':>6}{'MB':>8}{'ms':>10}{'pages/s':>10}"
+        f"{'MB/s':>8}{'Peak MB':>9}{'vs base':>9}"
+    ]
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        change = ""
+        if base is not None and base.seconds:
+            ratio = result.seconds / base.seconds
+            change = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio > 1 + threshold:
+                change += " ⚠️"
+                regressions.append(result.name)
+        lines.append(
+            f"{result.name:<28}{result.pages:>6}{result.bytes / 1_048_576:>8.2f}"
+            f"{result.seconds * 1000:>10.1f}{result.pages_per_second:>10.1f}"
+            f"{result.mb_per_second:>8.2f}{result.peak_memory / 1_048_576:>9.1f}"
+            f"{change:>9}"
+        )
+    return "\n".join(lines), regressions
+
+
+@click.command()
+@click.option(
+    "--docs-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path("docs"),
+    help="Documentation tree to benchmark (default: docs)",
+)
+@click.option(
+    "--pages", type=click.IntRange(min=1), default=4, help="Generated corpus pages"
+)
+@click.option(
+    "--sections",
+    type=click.IntRange(min=1),
+    default=800,
+    help=(
+        "Sections per generated page; each adds an admonition, code block, "
+        "table or role"
+    ),
+)
+@click.option(
+    "--repeat", type=click.IntRange(min=1), default=3, help="Timed runs per benchmark"
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=BASELINE_PATH,
+    help="Baseline results to compare with",
+)
+@click.option(
+    "--save-baseline", is_flag=True, help="Store these results as the baseline"
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD,
+    help="Relative slowdown counted as a regression (default: 0.25)",
+)
+@click.option(
+    "--fail-on-regression", is_flag=True, help="Exit with status 1 on regressions"
+)
+def main(
+    docs_dir: Path,
+    pages: int,
+    sections: int,
+    repeat: int,
+    baseline: Path,
+    save_baseline: bool,
+    threshold: float,
+    fail_on_regression: bool,
+) -> None:
+    """Benchmark the RST to HTML pipeline and compare with a stored baseline."""
+    click.echo("⏱️  Running rst_to_html benchmarks...")
+    results = run_benchmarks(docs_dir, pages, sections, repeat)
+
+    report, regressions = format_report(results, load_baseline(baseline), threshold)
+    click.echo(report)
+
+    if save_baseline:
+        write_baseline(baseline, results)
+        click.echo(f"Baseline written to {baseline}")
+    elif regressions:
+        click.echo(f"⚠️  Slower than baseline: {', '.join(regressions)}")
+        if fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Change sets of output pages and assets for incremental Canvas uploads
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+CHANGESET_FILENAME = ".rst_to_html_changes.json"
+
+ADDED = "added"
+MODIFIED = "modified"
+REMOVED = "removed"
+_STATES = (ADDED, MODIFIED, REMOVED)
+
+
+def _merge_state(earlier: str | None, later: str) -> str | None:
+    """Combine two successive changes to the same file (None: no net change)"""
+    if earlier is None:
+        return later
+    if earlier == ADDED:
+        return None if later == REMOVED else ADDED
+    if earlier == REMOVED and later == ADDED:
+        return MODIFIED
+    return later
+
+
+@dataclass
+class ChangeSet:
+    """Output files that changed since the last export.
+
+    Paths are relative to the output directory and map to one of "added",
+    "modified" or "removed". The converter merges every build into the
+    pending change set on disk; the uploader deletes the file once it has
+    sent the delta to Canvas.
+    """
+
+    pages: dict[str, str] = field(default_factory=dict)
+    assets: dict[str, str] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.pages or self.assets)
+
+    def add_page(self, path: str, state: str) -> None:
+        self._add(self.pages, path, state)
+
+    def add_asset(self, path: str, state: str) -> None:
+        self._add(self.assets, path, state)
+
+    @staticmethod
+    def _add(entries: dict[str, str], path: str, state: str) -> None:
+        merged = _merge_state(entries.get(path), state)
+        if merged is None:
+            entries.pop(path, None)
+        else:
+            entries[path] = merged
+
+    def merge(self, later: ChangeSet) -> None:
+        """Fold a later change set into this one"""
+        for path, state in later.pages.items():
+            self.add_page(path, state)
+        for path, state in later.assets.items():
+            self.add_asset(path, state)
+
+    def to_dict(self) -> dict[str, dict[str, list[str]]]:
+        """JSON layout: {"pages": {"added": [...], ...}, "assets": {...}}"""
+        return {
+            kind: {
+                state: sorted(path for path, s in entries.items() if s == state)
+                for state in _STATES
+            }
+            for kind, entries in (("pages", self.pages), ("assets", self.assets))
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ChangeSet:
+        change_set = cls()
+        for state in _STATES:
+            for path in data.get("pages", {}).get(state, []):
+                change_set.pages[path] = state
+            for path in data.get("assets", {}).get(state, []):
+                change_set.assets[path] = state
+        return change_set
+
+    @classmethod
+    def load(cls, path: Path) -> ChangeSet:
+        """Read a pending change set, or return an empty one"""
+        try:
+            return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, AttributeError):
+            return cls()
+
+    def save(self, path: Path) -> None:
+        """Write the change set atomically"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        tmp_path.replace(path)
+
+    def summary(self) -> str:
+        """Short human-readable description, e.g. '2 pages, 1 asset'"""
+        pages = len(self.pages)
+        assets = len(self.assets)
+        return (
+            f"{pages} page{'s' if pages != 1 else ''}, "
+            f"{assets} asset{'s' if assets != 1 else ''}"
+        )
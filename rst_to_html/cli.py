@@ -12,6 +12,8 @@ from pathlib import Path
 import click
 
 from . import RSTConverter, Config
+from .profiling import NULL_PROFILER, Profiler
+from .watcher import WatchBuilder
 
 
 @click.command()
@@ -29,12 +31,77 @@ from . import RSTConverter, Config
 )
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 @click.option("--no-canvas", is_flag=True, help="Disable Canvas LMS compatibility mode")
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes to convert files in parallel (default: 1)",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Rebuild every page, even those the build manifest marks as unchanged",
+)
+@click.option(
+    "--changed",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    multiple=True,
+    help="Only reconvert pages that are, or include, this file (repeatable)",
+)
+@click.option(
+    "--no-highlight-cache",
+    is_flag=True,
+    help="Re-highlight every code block instead of reusing cached fragments",
+)
+@click.option(
+    "--hardlink-static",
+    is_flag=True,
+    help="Hardlink static files into the output instead of copying them",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report wall time and allocated memory per file and pipeline stage",
+)
+@click.option(
+    "--profile-top",
+    type=click.IntRange(min=1),
+    default=15,
+    help="Number of stages and files listed in the profile report (default: 15)",
+)
+@click.option(
+    "--profile-json",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Also write the profile measurements to this JSON file",
+)
+@click.option(
+    "--profile-pstats",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Also run cProfile and write its stats to this file",
+)
+@click.option(
+    "--watch",
+    "-w",
+    is_flag=True,
+    help="After converting, keep watching the sources and rebuild affected pages",
+)
 @click.version_option(version="1.0.0", prog_name="rst-to-html")
 def main(
     source_dir: Path,
     output_dir: Path,
     verbose: bool,
     no_canvas: bool,
+    jobs: int,
+    force: bool,
+    changed: tuple[Path, ...],
+    no_highlight_cache: bool,
+    hardlink_static: bool,
+    profile: bool,
+    profile_top: int,
+    profile_json: Path | None,
+    profile_pstats: Path | None,
+    watch: bool,
 ) -> None:
     """
     Convert RST files to HTML with inlined CSS and Canvas LMS compatibility.
@@ -53,6 +120,21 @@ def main(
 
         # Convert without Canvas LMS compatibility
         python -m rst_to_html --no-canvas
+
+        # Convert using 4 worker processes
+        python -m rst_to_html --jobs 4
+
+        # Rebuild every page, ignoring the build manifest
+        python -m rst_to_html --force
+
+        # Rebuild only the pages that include an example sketch
+        python -m rst_to_html --changed examples/servo_motor.ino
+
+        # Rebuild affected pages whenever a source or example changes
+        python -m rst_to_html --watch
+
+        # Show where conversion time goes, keeping cProfile data
+        python -m rst_to_html --force --profile --profile-pstats build.pstats
     """
 
     try:
@@ -62,6 +144,10 @@ def main(
             output_dir=output_dir,
             verbose=verbose,
             canvas_mode=not no_canvas,
+            jobs=jobs,
+            force_rebuild=force,
+            highlight_cache=not no_highlight_cache,
+            static_hardlinks=hardlink_static,
         )
 
         if verbose:
@@ -69,20 +155,51 @@ def main(
             click.echo(f"   Source: {config.source_dir}")
             click.echo(f"   Output: {config.output_dir}")
             click.echo(f"   Canvas Mode: {config.canvas_mode}")
+            click.echo(f"   Jobs: {config.jobs}")
             click.echo("")
 
+        profiler = NULL_PROFILER
+        if profile or profile_json or profile_pstats:
+            profiler = Profiler(use_cprofile=profile_pstats is not None)
+            if jobs > 1:
+                click.echo("ℹ️  Profiling converts files serially")
+
         # Initialize converter
-        converter = RSTConverter(config)
+        converter = RSTConverter(config, profiler)
 
         # Perform conversion
         click.echo("🚀 Starting conversion...")
-        success_count, total_files = converter.convert_all_files()
+        if profiler.enabled:
+            profiler.start()
+        try:
+            if changed:
+                success_count, total_files = converter.convert_affected_files(changed)
+            else:
+                success_count, total_files = converter.convert_all_files()
+        finally:
+            if profiler.enabled:
+                profiler.stop()
 
         # Display results
         click.echo("")
         summary = converter.get_conversion_summary(success_count, total_files)
         click.echo(summary)
 
+        if profiler.enabled:
+            click.echo("")
+            click.echo(profiler.report(profile_top))
+            if profile_json:
+                profiler.write_json(profile_json)
+                click.echo(f"Profile data written to {profile_json}")
+            if profile_pstats:
+                profiler.write_pstats(profile_pstats)
+                click.echo(f"cProfile stats written to {profile_pstats}")
+
+        if watch:
+            click.echo("")
+            WatchBuilder(converter).run()
+            sys.exit(0)
+
         # Exit with appropriate code
         if success_count == total_files:
             sys.exit(0)
@@ -21,10 +21,16 @@ class Config:
     input_encoding: str = "utf-8"
     output_encoding: str = "utf-8"
     initial_header_level: int = 1
-    syntax_highlight: str = "short"
+    # Code blocks are highlighted by the HTML writer; docutils does not tokenize them
+    syntax_highlight: str = "none"
 
     # Behavior flags
     verbose: bool = False
+    jobs: int = 1  # Number of worker processes used for conversion
+    force_rebuild: bool = False  # Ignore the build manifest and convert everything
+    highlight_cache: bool = True  # Reuse highlighted code fragments across builds
+    highlight_cache_dir: Path | None = None  # Defaults to a directory in output_dir
+    highlight_cache_max_bytes: int = 32 * 1024 * 1024
     embed_stylesheet: bool = False
     file_insertion_enabled: bool = True
     raw_enabled: bool = True
@@ -39,6 +45,7 @@ class Config:
 
     # Static directories to copy
     static_dirs: list[str] = None
+    static_hardlinks: bool = False  # Hardlink static files instead of copying
 
     # Custom CSS files to include
     custom_css_files: list[str] = None
@@ -72,11 +79,21 @@ class Config:
             "syntax_highlight": self.syntax_highlight,
         }
 
+    @property
+    def highlight_cache_path(self) -> Path:
+        """Directory holding cached highlighted code fragments"""
+        if self.highlight_cache_dir is not None:
+            return Path(self.highlight_cache_dir)
+        return self.output_dir / ".rst_to_html_cache" / "highlight"
+
     def validate(self) -> None:
         """Validate configuration settings"""
         if not self.source_dir.exists():
             raise ValueError(f"Source directory does not exist: {self.source_dir}")
 
+        if self.jobs < 1:
+            raise ValueError(f"Number of jobs must be at least 1: {self.jobs}")
+
         # Ensure paths are Path objects
         self.source_dir = Path(self.source_dir)
         self.output_dir = Path(self.output_dir)
@@ -88,11 +105,19 @@ class Config:
         output_dir: Path | str | None = None,
         verbose: bool = False,
         canvas_mode: bool = True,
+        jobs: int = 1,
+        force_rebuild: bool = False,
+        highlight_cache: bool = True,
+        static_hardlinks: bool = False,
     ) -> Config:
         """Create configuration from command line arguments"""
         config = cls(
             verbose=verbose,
             canvas_mode=canvas_mode,
+            jobs=jobs,
+            force_rebuild=force_rebuild,
+            highlight_cache=highlight_cache,
+            static_hardlinks=static_hardlinks,
         )
 
         if source_dir:
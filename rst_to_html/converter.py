@@ -4,25 +4,66 @@ Main RST to HTML converter class
 
 from __future__ import annotations
 
+import dataclasses
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable
 
-from docutils.core import publish_file
+from docutils import io
+from docutils.core import publish_programmatically
 from docutils.parsers.rst import Parser
-from docutils.writers.html5_polyglot import Writer
 
+from .changeset import ADDED, CHANGESET_FILENAME, MODIFIED, REMOVED, ChangeSet
 from .config import Config
-from .file_utils import FileUtils
+from .dependency_graph import DependencyGraph
+from .file_utils import FileUtils, SyncResult
+from .highlight_cache import HighlightCache
 from .html_processor import HTMLProcessor
+from .html_writer import CanvasHTMLWriter
+from .manifest import BuildManifest, hash_bytes, hash_file, normalize_dependency
+from .profiling import NULL_PROFILER, NullProfiler, Profiler
+from .pygments_processor import create_pygments_processor
 from .sphinx_directives import register_sphinx_directives
 
 
+@dataclass
+class ConversionResult:
+    """Outcome of converting a single RST file"""
+
+    input_file: Path
+    output_file: Path
+    success: bool
+    elapsed: float  # Wall time in seconds
+    error: str | None = None
+    dependencies: list[str] = field(default_factory=list)
+    output_hash: str | None = None  # Hash of the final HTML
+
+
 class RSTConverter:
     """Main converter class for RST to HTML conversion"""
 
-    def __init__(self, config: Config):
+    def __init__(
+        self, config: Config, profiler: Profiler | NullProfiler = NULL_PROFILER
+    ):
         self.config = config
+        self.profiler = profiler
         self.file_utils = FileUtils()
-        self.html_processor = HTMLProcessor()
+        self.html_processor = HTMLProcessor(profiler)
+        self.pygments_processor = create_pygments_processor(
+            HighlightCache(
+                config.highlight_cache_path, config.highlight_cache_max_bytes
+            )
+            if config.highlight_cache
+            else None,
+            profiler,
+        )
+        self.results: list[ConversionResult] = []
+        self.skipped_count = 0
+        self.dependency_graph = DependencyGraph()
+        self.static_sync = SyncResult()
+        self.change_set = ChangeSet()  # Output changes made by the last run
 
         # Register Sphinx directives
         register_sphinx_directives()
@@ -32,23 +73,52 @@ class RSTConverter:
 
     def convert_single_file(self, input_file: Path, output_file: Path) -> bool:
         """Convert a single RST file to HTML"""
-        try:
-            if self.config.verbose:
-                print(f"Converting: {input_file} -> {output_file}")
+        if self.config.verbose:
+            print(f"Converting: {input_file} -> {output_file}")
+
+        with self.profiler.file(input_file):
+            result = self._convert_file(input_file, output_file)
+        self._report_result(result)
+        return result.success
 
+    def _convert_file(self, input_file: Path, output_file: Path) -> ConversionResult:
+        """Convert a single RST file to HTML without reporting to stdout"""
+        start = time.perf_counter()
+        try:
             # Ensure output directory exists
             self.file_utils.ensure_output_dir(output_file)
 
             # Convert RST to HTML using docutils
-            with open(input_file, "r", encoding="utf-8") as input_f:
-                html_output = publish_file(
+            with (
+                open(input_file, "r", encoding="utf-8") as input_f,
+                self.profiler.stage("docutils"),
+            ):
+                html_output, publisher = publish_programmatically(
+                    source_class=io.FileInput,
                     source=input_f,
+                    source_path=None,
+                    destination_class=io.StringOutput,
                     destination=None,
-                    writer=Writer(),
+                    destination_path=None,
+                    reader=None,
+                    reader_name=None,
                     parser=Parser(),
+                    parser_name=None,
+                    writer=CanvasHTMLWriter(self.pygments_processor, self.profiler),
+                    writer_name=None,
+                    settings=None,
+                    settings_spec=None,
                     settings_overrides=self.config.docutils_settings,
+                    config_section=None,
+                    enable_exit_status=False,
                 )
 
+            # Files pulled in while parsing (include, whole-literal-include, ...)
+            dependencies = [
+                normalize_dependency(dependency)
+                for dependency in publisher.settings.record_dependencies.list
+            ]
+
             # Decode if bytes
             if isinstance(html_output, bytes):
                 html_output = html_output.decode("utf-8")
@@ -57,17 +127,36 @@ class RSTConverter:
             html_output = self.html_processor.process_html(html_output)
 
             # Write final HTML
-            with open(output_file, "w", encoding="utf-8") as output_f:
+            with (
+                self.profiler.stage("save"),
+                open(output_file, "w", encoding="utf-8") as output_f,
+            ):
                 output_f.write(html_output)
 
-            if self.config.verbose:
-                print(f"Successfully converted: {input_file.name}")
-
-            return True
+            return ConversionResult(
+                input_file,
+                output_file,
+                True,
+                time.perf_counter() - start,
+                dependencies=dependencies,
+                output_hash=hash_bytes(html_output.encode("utf-8")),
+            )
 
         except Exception as e:
-            print(f"Error converting {input_file}: {e}")
-            return False
+            return ConversionResult(
+                input_file, output_file, False, time.perf_counter() - start, str(e)
+            )
+
+    def _report_result(self, result: ConversionResult) -> None:
+        """Print the outcome of a single file conversion"""
+        if result.success:
+            if self.config.verbose:
+                print(
+                    f"Successfully converted: {result.input_file.name} "
+                    f"({result.elapsed * 1000:.1f} ms)"
+                )
+        else:
+            print(f"Error converting {result.input_file}: {result.error}")
 
     def convert_all_files(self) -> tuple[int, int]:
         """Convert all RST files in the source directory"""
@@ -79,35 +168,279 @@ class RSTConverter:
             return 0, 0
 
         # Create output structure
-        self.file_utils.create_output_structure(
-            self.config.source_dir, self.config.output_dir, self.config.static_dirs
-        )
+        self.sync_static_files()
 
-        success_count = 0
         total_files = len(rst_files)
 
         print(f"Found {total_files} RST files to convert")
 
-        # Convert each file
+        self.change_set = ChangeSet()
+        self._record_static_changes()
+
+        manifest = self._load_manifest()
+        source_hashes: dict[Path, str | None] = {}
+
+        jobs: list[tuple[Path, Path]] = []
+        self.skipped_count = 0
         for rst_file in rst_files:
-            output_file = self.file_utils.calculate_relative_path(
-                rst_file, self.config.source_dir, self.config.output_dir
+            source_hashes[rst_file] = hash_file(rst_file)
+
+            if (
+                not self.config.force_rebuild
+                and source_hashes[rst_file] is not None
+                and manifest.is_up_to_date(
+                    self._source_key(rst_file),
+                    source_hashes[rst_file],
+                    self.config.output_dir,
+                )
+            ):
+                self.skipped_count += 1
+                if self.config.verbose:
+                    print(f"Up to date: {rst_file}")
+                continue
+
+            jobs.append((rst_file, self._output_path(rst_file)))
+
+        self.results = self._run_jobs(jobs)
+
+        # Update the manifest and drop outputs of deleted sources
+        self._record_results(manifest, source_hashes)
+        for removed in manifest.remove_stale(
+            {
+                self._source_key(rst_file): self._output_path(rst_file)
+                .relative_to(self.config.output_dir)
+                .as_posix()
+                for rst_file in rst_files
+            },
+            self.config.output_dir,
+        ):
+            print(f"Removed stale output: {removed}")
+            self.change_set.add_page(
+                removed.relative_to(self.config.output_dir).as_posix(), REMOVED
             )
 
-            if self.convert_single_file(rst_file, output_file):
-                success_count += 1
+        manifest.save()
+        self.dependency_graph = DependencyGraph.from_manifest(manifest)
+        self._prune_highlight_cache()
+        self._export_change_set()
 
+        # Unchanged pages count as successful conversions
+        success_count = self.skipped_count + sum(
+            1 for result in self.results if result.success
+        )
         return success_count, total_files
 
+    def sync_static_files(self) -> SyncResult:
+        """Bring static directories in the output up to date with the sources"""
+        with self.profiler.stage("static_sync"):
+            self.static_sync = self.file_utils.create_output_structure(
+                self.config.source_dir,
+                self.config.output_dir,
+                self.config.static_dirs,
+                use_hardlinks=self.config.static_hardlinks,
+            )
+        return self.static_sync
+
+    def sync_static_and_export(self) -> SyncResult:
+        """Sync static files and add the asset changes to the pending change set"""
+        self.change_set = ChangeSet()
+        self.sync_static_files()
+        self._record_static_changes()
+        self._export_change_set()
+        return self.static_sync
+
+    @property
+    def change_set_path(self) -> Path:
+        """Pending change set that the Canvas uploader consumes"""
+        return self.config.output_dir / CHANGESET_FILENAME
+
+    def _record_static_changes(self) -> None:
+        """Add the assets touched by the last static sync to the change set"""
+        for state, paths in (
+            (ADDED, self.static_sync.added),
+            (MODIFIED, self.static_sync.updated),
+            (REMOVED, self.static_sync.removed),
+        ):
+            for path in paths:
+                self.change_set.add_asset(path.as_posix(), state)
+
+    def _export_change_set(self) -> None:
+        """Merge this run's changes into the pending change set on disk.
+
+        Changes accumulate across builds until the uploader deletes the file.
+        """
+        pending = ChangeSet.load(self.change_set_path)
+        pending.merge(self.change_set)
+        pending.save(self.change_set_path)
+
+    def convert_affected_files(
+        self, changed_paths: Iterable[Path]
+    ) -> tuple[int, int]:
+        """Reconvert only the pages affected by the given changed files.
+
+        A page is affected if it is one of the changed files itself or if it
+        includes one of them (e.g. an example sketch pulled in through
+        ``whole-literal-include``), according to the dependency graph.
+        """
+        manifest = self._load_manifest()
+        self.dependency_graph = DependencyGraph.from_manifest(manifest)
+
+        changed = list(changed_paths)
+        pages = self.dependency_graph.affected_pages(changed)
+        source_dir = self.config.source_dir.resolve()
+        for path in changed:
+            resolved = path.resolve()
+            if resolved.suffix == ".rst" and resolved.is_relative_to(source_dir):
+                pages.add(resolved.relative_to(source_dir).as_posix())
+
+        rst_files = [
+            self.config.source_dir / page
+            for page in sorted(pages)
+            if (self.config.source_dir / page).exists()
+        ]
+        source_hashes = {rst_file: hash_file(rst_file) for rst_file in rst_files}
+
+        self.skipped_count = 0
+        self.change_set = ChangeSet()
+        self.results = self._run_jobs(
+            [(rst_file, self._output_path(rst_file)) for rst_file in rst_files]
+        )
+
+        self._record_results(manifest, source_hashes)
+        manifest.save()
+        self.dependency_graph = DependencyGraph.from_manifest(manifest)
+        self._prune_highlight_cache()
+        self._export_change_set()
+
+        success_count = sum(1 for result in self.results if result.success)
+        return success_count, len(rst_files)
+
+    def _source_key(self, rst_file: Path) -> str:
+        """Manifest key of a source file: its path relative to the source dir"""
+        return rst_file.relative_to(self.config.source_dir).as_posix()
+
+    def _output_path(self, rst_file: Path) -> Path:
+        """Output HTML path for a source file"""
+        return self.file_utils.calculate_relative_path(
+            rst_file, self.config.source_dir, self.config.output_dir
+        )
+
+    def _load_manifest(self) -> BuildManifest:
+        """Load the build manifest from the output directory"""
+        return BuildManifest.load(self.config.output_dir, self.config.docutils_settings)
+
+    def _run_jobs(self, jobs: list[tuple[Path, Path]]) -> list[ConversionResult]:
+        """Convert (input, output) pairs serially or in the worker pool"""
+        # Profiles are collected in this process, so profiling runs serially
+        if self.config.jobs > 1 and len(jobs) > 1 and not self.profiler.enabled:
+            return self._convert_parallel(jobs)
+
+        results: list[ConversionResult] = []
+        for rst_file, output_file in jobs:
+            if self.config.verbose:
+                print(f"Converting: {rst_file} -> {output_file}")
+            with self.profiler.file(rst_file):
+                result = self._convert_file(rst_file, output_file)
+            self._report_result(result)
+            results.append(result)
+        return results
+
+    def _record_results(
+        self, manifest: BuildManifest, source_hashes: dict[Path, str | None]
+    ) -> None:
+        """Store the outcome of the last conversion run in the manifest"""
+        for result in self.results:
+            key = self._source_key(result.input_file)
+            source_hash = source_hashes.get(result.input_file)
+            if result.success and source_hash is not None:
+                output = result.output_file.relative_to(
+                    self.config.output_dir
+                ).as_posix()
+                manifest.record(key, source_hash, output, result.dependencies)
+
+                # Pages whose final HTML did not change need no upload
+                previous_hash = manifest.record_output(output, result.output_hash)
+                if previous_hash is None:
+                    self.change_set.add_page(output, ADDED)
+                elif previous_hash != result.output_hash:
+                    self.change_set.add_page(output, MODIFIED)
+            else:
+                manifest.forget(key)
+
+    def _prune_highlight_cache(self) -> None:
+        """Keep the highlight cache within its size cap"""
+        cache = self.pygments_processor.cache
+        if cache is None:
+            return
+        evicted = cache.prune()
+        if evicted and self.config.verbose:
+            print(f"Evicted {evicted} cached highlight fragments")
+
+    def _convert_parallel(
+        self, jobs: list[tuple[Path, Path]]
+    ) -> list[ConversionResult]:
+        """Convert files in a pool of worker processes"""
+        workers = min(self.config.jobs, len(jobs))
+        if self.config.verbose:
+            print(f"Converting with {workers} worker processes")
+
+        # Workers build their own converter; keep them quiet and report here
+        worker_config = dataclasses.replace(self.config, verbose=False)
+
+        results: list[ConversionResult] = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(worker_config,),
+        ) as executor:
+            # map() yields in submission order, so reporting matches the serial path
+            for result in executor.map(_convert_in_worker, jobs):
+                if self.config.verbose:
+                    print(f"Converting: {result.input_file} -> {result.output_file}")
+                self._report_result(result)
+                results.append(result)
+
+        return results
+
     def get_conversion_summary(self, success_count: int, total_files: int) -> str:
         """Generate a summary of the conversion results"""
+        skipped = (
+            f"Skipped {self.skipped_count} unchanged files\n"
+            if self.skipped_count
+            else ""
+        )
+        if self.change_set:
+            skipped += (
+                f"Changed outputs: {self.change_set.summary()} "
+                f"(pending upload list: {self.change_set_path})\n"
+            )
         if success_count == total_files:
             return (
                 f"✅ All {total_files} files converted successfully!\n"
+                f"{skipped}"
                 f"Output directory: {self.config.output_dir}"
             )
         else:
             return (
                 f"⚠️  Conversion completed: {success_count}/{total_files} files successful\n"
+                f"{skipped}"
                 f"Output directory: {self.config.output_dir}"
             )
+
+
+# Per-process converter used by the worker pool. Each worker registers the
+# Sphinx directives and builds its own HTMLProcessor exactly once.
+_worker_converter: RSTConverter | None = None
+
+
+def _init_worker(config: Config) -> None:
+    """Initialize the converter for a worker process"""
+    global _worker_converter
+    _worker_converter = RSTConverter(config)
+
+
+def _convert_in_worker(job: tuple[Path, Path]) -> ConversionResult:
+    """Convert one file inside a worker process"""
+    assert _worker_converter is not None, "worker was not initialized"
+    input_file, output_file = job
+    return _worker_converter._convert_file(input_file, output_file)
@@ -0,0 +1,74 @@
+"""
+Reverse-dependency tracking between pages and the files they include
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable
+
+from .manifest import BuildManifest
+
+
+def _resolve(path: str | Path) -> str:
+    """Resolve a path so the same file always maps to the same key"""
+    return Path(path).resolve().as_posix()
+
+
+class DependencyGraph:
+    """Maps included files (e.g. example sketches) to the pages that use them.
+
+    Pages are identified by their source path relative to the source
+    directory, matching the keys of the build manifest.
+    """
+
+    def __init__(self) -> None:
+        self._dependents: dict[str, set[str]] = {}
+        self._dependencies: dict[str, set[str]] = {}
+
+    @classmethod
+    def from_manifest(cls, manifest: BuildManifest) -> DependencyGraph:
+        """Build the graph from the dependencies recorded in a manifest"""
+        graph = cls()
+        for page, record in manifest.pages.items():
+            graph.set_dependencies(page, record.dependencies)
+        return graph
+
+    def set_dependencies(self, page: str, dependencies: Iterable[str]) -> None:
+        """Replace the recorded dependencies of a page"""
+        self.remove_page(page)
+        resolved = {_resolve(dependency) for dependency in dependencies}
+        self._dependencies[page] = resolved
+        for dependency in resolved:
+            self._dependents.setdefault(dependency, set()).add(page)
+
+    def remove_page(self, page: str) -> None:
+        """Forget a page and its outgoing edges"""
+        for dependency in self._dependencies.pop(page, set()):
+            pages = self._dependents.get(dependency)
+            if pages is not None:
+                pages.discard(page)
+                if not pages:
+                    del self._dependents[dependency]
+
+    def dependencies_of(self, page: str) -> set[str]:
+        """Files included by a page"""
+        return set(self._dependencies.get(page, set()))
+
+    def dependents_of(self, path: str | Path) -> set[str]:
+        """Pages that include the given file"""
+        return set(self._dependents.get(_resolve(path), set()))
+
+    def affected_pages(self, changed_paths: Iterable[str | Path]) -> set[str]:
+        """Pages that must be rebuilt after the given files changed"""
+        affected: set[str] = set()
+        for path in changed_paths:
+            affected |= self.dependents_of(path)
+        return affected
+
+    def as_dict(self) -> dict[str, list[str]]:
+        """Serializable view of the graph: dependency -> sorted pages"""
+        return {
+            dependency: sorted(pages)
+            for dependency, pages in sorted(self._dependents.items())
+        }
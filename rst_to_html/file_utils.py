@@ -4,10 +4,46 @@ File system utilities for RST to HTML conversion
 
 from __future__ import annotations
 
+import json
+import os
 import shutil
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List
 
+# Size and mtime of hardlinked static files at the last sync, per directory
+STATIC_STATE_FILENAME = ".rst_to_html_static.json"
+
+
+@dataclass
+class SyncResult:
+    """Outcome of synchronizing static files into the output directory"""
+
+    added: List[Path] = field(default_factory=list)  # Files new to the output
+    updated: List[Path] = field(default_factory=list)  # Files overwritten
+    removed: List[Path] = field(default_factory=list)  # Stale files deleted
+    unchanged: int = 0
+
+    @property
+    def copied(self) -> List[Path]:
+        """Every file written by the sync"""
+        return self.added + self.updated
+
+    def merge(self, other: SyncResult) -> None:
+        self.added.extend(other.added)
+        self.updated.extend(other.updated)
+        self.removed.extend(other.removed)
+        self.unchanged += other.unchanged
+
+    def relative_to_parent(self, name: str) -> SyncResult:
+        """The same result with every path prefixed by a directory name"""
+        return SyncResult(
+            added=[Path(name) / path for path in self.added],
+            updated=[Path(name) / path for path in self.updated],
+            removed=[Path(name) / path for path in self.removed],
+            unchanged=self.unchanged,
+        )
+
 
 class FileUtils:
     """File system operations for the converter"""
@@ -26,22 +62,160 @@ class FileUtils:
 
     @staticmethod
     def create_output_structure(
-        source_dir: Path, output_dir: Path, static_dirs: List[str]
-    ) -> None:
-        """Create output directory structure and copy static files"""
+        source_dir: Path,
+        output_dir: Path,
+        static_dirs: List[str],
+        use_hardlinks: bool = False,
+    ) -> SyncResult:
+        """Create output directory structure and sync static files.
+
+        Returned paths are relative to the output directory.
+        """
         # Create output directory
         output_dir.mkdir(parents=True, exist_ok=True)
+        state_path = output_dir / STATIC_STATE_FILENAME
+        state = FileUtils._load_static_state(state_path)
 
-        # Copy static directories
+        # Sync static directories
+        result = SyncResult()
         for static_dir in static_dirs:
             src_static = source_dir / static_dir
             dst_static = output_dir / static_dir
 
             if src_static.exists():
-                if dst_static.exists():
-                    shutil.rmtree(dst_static)
-                shutil.copytree(src_static, dst_static)
-                print(f"Copied {static_dir} to output directory")
+                synced = FileUtils.sync_directory(
+                    src_static,
+                    dst_static,
+                    use_hardlinks,
+                    linked_stats=state.setdefault(static_dir, {}),
+                )
+                if synced.copied or synced.removed:
+                    print(
+                        f"Synced {static_dir} to output directory "
+                        f"({len(synced.copied)} copied, {len(synced.removed)} removed)"
+                    )
+                result.merge(synced.relative_to_parent(static_dir))
+
+        state = {name: stats for name, stats in state.items() if stats}
+        if state or state_path.exists():
+            FileUtils._save_static_state(state_path, state)
+        return result
+
+    @staticmethod
+    def _load_static_state(path: Path) -> dict[str, dict[str, list[int]]]:
+        """Read the recorded hardlink stats, or nothing if they are unreadable"""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {name: stats for name, stats in data.items() if isinstance(stats, dict)}
+
+    @staticmethod
+    def _save_static_state(path: Path, state: dict[str, dict[str, list[int]]]) -> None:
+        """Atomically write the recorded hardlink stats"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        tmp_path.replace(path)
+
+    @staticmethod
+    def sync_directory(
+        src_dir: Path,
+        dst_dir: Path,
+        use_hardlinks: bool = False,
+        linked_stats: dict[str, list[int]] | None = None,
+    ) -> SyncResult:
+        """Make dst_dir mirror src_dir, touching only files that differ.
+
+        Files are considered unchanged when size and modification time match
+        (copies keep the source mtime). A hardlinked output is the source
+        file, so it is compared against the size and mtime recorded in
+        linked_stats at the last sync instead, which catches in-place edits.
+        linked_stats is updated in place. Files missing from src_dir are
+        removed. Returned paths are relative to the two directories.
+        """
+        result = SyncResult()
+        expected: set[Path] = set()
+        if linked_stats is None:
+            linked_stats = {}
+        previous_stats = dict(linked_stats)
+        linked_stats.clear()
+
+        for src_file in sorted(src_dir.rglob("*")):
+            if not src_file.is_file():
+                continue
+            relative = src_file.relative_to(src_dir)
+            expected.add(relative)
+            dst_file = dst_dir / relative
+            key = relative.as_posix()
+
+            if FileUtils._is_synced(src_file, dst_file, previous_stats.get(key)):
+                result.unchanged += 1
+            else:
+                existed = dst_file.exists()
+                dst_file.parent.mkdir(parents=True, exist_ok=True)
+                FileUtils._place_file(src_file, dst_file, use_hardlinks)
+                (result.updated if existed else result.added).append(relative)
+
+            src_stat = src_file.stat()
+            if os.path.samestat(src_stat, dst_file.stat()):
+                linked_stats[key] = [src_stat.st_size, src_stat.st_mtime_ns]
+
+        if dst_dir.exists():
+            # Remove stale files, then directories left empty
+            for dst_path in sorted(dst_dir.rglob("*"), reverse=True):
+                relative = dst_path.relative_to(dst_dir)
+                if dst_path.is_dir() and not dst_path.is_symlink():
+                    if (src_dir / relative).is_dir() or any(dst_path.iterdir()):
+                        continue
+                    dst_path.rmdir()
+                elif relative not in expected:
+                    dst_path.unlink()
+                    result.removed.append(relative)
+
+        return result
+
+    @staticmethod
+    def _is_synced(
+        src_file: Path, dst_file: Path, linked_stat: list[int] | None = None
+    ) -> bool:
+        """Whether dst_file already holds the contents of src_file.
+
+        linked_stat is the size and mtime recorded when dst_file was last
+        synced as a hardlink of src_file.
+        """
+        try:
+            dst_stat = dst_file.stat()
+        except OSError:
+            return False
+        src_stat = src_file.stat()
+        if os.path.samestat(src_stat, dst_stat):
+            # The same file: changed only if it was edited since the last sync
+            return linked_stat == [src_stat.st_size, src_stat.st_mtime_ns]
+        return (
+            src_stat.st_size == dst_stat.st_size
+            and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+        )
+
+    @staticmethod
+    def _place_file(src_file: Path, dst_file: Path, use_hardlinks: bool) -> None:
+        """Atomically replace dst_file with a hardlink to or a copy of src_file"""
+        tmp_file = dst_file.with_name(f".{dst_file.name}.{os.getpid()}.tmp")
+        tmp_file.unlink(missing_ok=True)
+        try:
+            if use_hardlinks:
+                try:
+                    os.link(src_file, tmp_file)
+                except OSError:
+                    # Different filesystem or no hardlink support
+                    shutil.copy2(src_file, tmp_file)
+            else:
+                shutil.copy2(src_file, tmp_file)
+            tmp_file.replace(dst_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
 
     @staticmethod
     def ensure_output_dir(output_file: Path) -> None:
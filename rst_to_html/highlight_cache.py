@@ -0,0 +1,109 @@
+"""
+Persistent on-disk cache of Pygments-highlighted code fragments
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from .manifest import hash_bytes, hash_file
+
+try:
+    from pygments import __version__ as PYGMENTS_VERSION
+except ImportError:
+    PYGMENTS_VERSION = ""
+
+CACHE_DIRNAME = ".rst_to_html_cache"
+
+# The fragments are what pygments_processor.py makes of Pygments' output, so
+# any edit to it (formatter settings, post-processing) gives new keys
+HIGHLIGHTER_FINGERPRINT = (
+    hash_file(Path(__file__).with_name("pygments_processor.py")) or ""
+)
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class HighlightCache:
+    """Content-addressed cache of highlighted HTML fragments.
+
+    Each fragment is stored in its own file, named after the hash of the
+    language, style and code it was produced from and of the highlighter
+    itself. Reading an entry refreshes its modification time, so pruning the
+    oldest files first evicts the least recently used fragments. Writes are atomic, which makes the cache safe to
+    share between worker processes.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, language: str, style: str, code: str) -> str:
+        """Cache key of a code fragment"""
+        return hash_bytes(
+            "\0".join(
+                (HIGHLIGHTER_FINGERPRINT, PYGMENTS_VERSION, language, style, code)
+            ).encode("utf-8")
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.html"
+
+    def get(self, key: str) -> str | None:
+        """Return a cached fragment, or None on a miss"""
+        path = self._path(key)
+        try:
+            fragment = path.read_text(encoding="utf-8")
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            # Mark as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        return fragment
+
+    def put(self, key: str, fragment: str) -> None:
+        """Store a fragment. Failures are ignored: the cache is an optimization"""
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(fragment, encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def prune(self) -> int:
+        """Evict least recently used entries until the cache fits its size cap.
+
+        Returns the number of evicted entries.
+        """
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if not entry.name.endswith(".html"):
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+                    total += stat.st_size
+        except OSError:
+            return 0
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,149 @@
+"""
+Single-pass HTML rewriting engine used by HTMLProcessor.process_html
+
+Instead of running one full-document regex substitution per transformation,
+the rewriter makes one pass per kind of work:
+
+- inline literals are found with one split of the page and become <code>.
+  Each distinct literal is converted once, so no Python code runs per match;
+- one walk then finds the <title> element, which is dropped, and the start
+  tags of docutils tables, system messages and problematic markers. Their
+  matching end tag is found by counting nested tags of the same name, and
+  their content is rewritten before it is wrapped, unwrapped or dropped.
+  The text between them is copied in bulk.
+
+Ordinary <div> and <table> tags are never looked at one by one, so the
+Python work per page grows with the number of elements to rewrite rather
+than with the size of the markup.
+
+:ref: and :term: roles are left for the caller, which converts them with
+replace_groups in one pass over the rewritten document: running the role
+patterns on every text run between tags costs far more than one scan of the
+whole page.
+
+Admonitions, whole code blocks and code highlighting are not handled here:
+the Canvas HTML writer emits their final markup directly.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable
+
+_LITERAL_RE = re.compile(r'<span class="docutils literal[^"]*">([^<]*)</span>')
+
+# The elements the walk handles all start with "<" and one of a few names, so
+# one scan with the alternatives factored after "<" finds them. The group that
+# matched last tells which kind of element was found.
+_ELEMENT_RE = re.compile(
+    r"<(?:(title)[^>]*>.*?</title>\s*"
+    r"|(table)\b[^>]*>"
+    r'|div class="(system-message|problematic)"[^>]*>)',
+    re.DOTALL,
+)
+_TITLE, _TABLE, _DIV = 1, 2, 3
+
+_DIV_TAG_RE = re.compile(r"</?div\b[^>]*>")
+_TABLE_TAG_RE = re.compile(r"</?table\b[^>]*>")
+_DOCUTILS_TABLE_RE = re.compile(r'<table[^>]*class="docutils"[^>]*>')
+
+
+def _matching_end(
+    tag_re: re.Pattern[str], html: str, pos: int, end: int
+) -> re.Match[str] | None:
+    """End tag closing the element whose start tag ends at pos, if any"""
+    depth = 1
+    for match in tag_re.finditer(html, pos, end):
+        tag = match.group()
+        if tag[1] == "/":
+            depth -= 1
+            if not depth:
+                return match
+        elif not tag.endswith("/>"):
+            depth += 1
+    return None
+
+
+def replace_groups(
+    pattern: re.Pattern[str], html_content: str, replace: Callable[[str], str]
+) -> str:
+    """Replace every match of a one-group pattern with replace(group)
+
+    Pages repeat the same literals and roles again and again, so each
+    distinct group is replaced once and the matches are looked up, without
+    the Python call re.sub makes for every match.
+    """
+    pieces = pattern.split(html_content)
+    if len(pieces) == 1:
+        return html_content
+    groups = pieces[1::2]
+    replacements = {group: replace(group) for group in set(groups)}
+    pieces[1::2] = map(replacements.__getitem__, groups)
+    return "".join(pieces)
+
+
+class HTMLRewriter:
+    """Applies the structural HTMLProcessor transformations in one walk"""
+
+    def rewrite(self, html_content: str) -> str:
+        """Rewrite a full HTML document"""
+        html_content = replace_groups(
+            _LITERAL_RE,
+            html_content,
+            lambda text: f'<code class="docutils literal">{text}</code>',
+        )
+        parts: list[str] = []
+        self._rewrite(html_content, 0, len(html_content), parts)
+        return "".join(parts)
+
+    def _rewrite(self, html: str, pos: int, end: int, parts: list[str]) -> None:
+        """Append the rewritten html[pos:end] to parts"""
+        search = _ELEMENT_RE.search
+        append = parts.append
+        match = search(html, pos, end)
+        while match is not None:
+            start = match.start()
+            if pos < start:
+                append(html[pos:start])
+            pos = match.end()
+            # The title is dropped along with the whitespace after it
+            if match.lastindex != _TITLE:
+                pos = self._element(html, match, end, parts)
+            match = search(html, pos, end)
+
+        if pos < end:
+            append(html[pos:end])
+
+    def _element(
+        self, html: str, match: re.Match[str], end: int, parts: list[str]
+    ) -> int:
+        """Rewrite the element whose start tag was matched
+
+        Returns the position after what was consumed.
+        """
+        tag = match.group()
+        pos = match.end()
+        is_table = match.lastindex == _TABLE
+        if tag.endswith("/>") or (
+            is_table and _DOCUTILS_TABLE_RE.fullmatch(tag) is None
+        ):
+            parts.append(tag)
+            return pos
+
+        tag_re = _TABLE_TAG_RE if is_table else _DIV_TAG_RE
+        close = _matching_end(tag_re, html, pos, end)
+        if close is None:
+            # Unclosed elements are kept; their content is still rewritten
+            parts.append(tag)
+            return pos
+
+        if is_table:
+            parts.append('<div class="table-wrapper">')
+            parts.append(tag)
+            self._rewrite(html, pos, close.start(), parts)
+            parts.append(close.group())
+            parts.append("</div>")
+        elif match.group(_DIV) == "problematic":
+            self._rewrite(html, pos, close.start(), parts)
+        # System messages are dropped with everything inside them
+        return close.end()
@@ -0,0 +1,216 @@
+"""
+Docutils HTML writer that renders Canvas-styled markup directly
+"""
+
+from __future__ import annotations
+
+from functools import partial
+
+from docutils import nodes
+from docutils.writers.html5_polyglot import HTMLTranslator, Writer
+
+from .profiling import NULL_PROFILER, NullProfiler, Profiler
+from .pygments_processor import PygmentsProcessor, create_pygments_processor
+from .sphinx_directives import canvas_admonition, whole_code_block
+
+# Define styles for different admonition types using Canvas-compatible inline styles
+# Now using separate colors for title background and border
+ADMONITION_STYLES = {
+    "note": {
+        "border_color": "#007bff",
+        "title_background": "#e7f3ff",
+        "title_color": "#004085",
+    },
+    "tip": {
+        "border_color": "#28a745",
+        "title_background": "#e8f5e8",
+        "title_color": "#155724",
+    },
+    "warning": {
+        "border_color": "#ffc107",
+        "title_background": "#fff8e1",
+        "title_color": "#856404",
+    },
+    "caution": {
+        "border_color": "#fd7e14",
+        "title_background": "#fef2e7",
+        "title_color": "#7a3b0e",
+    },
+    "danger": {
+        "border_color": "#dc3545",
+        "title_background": "#fce8e8",
+        "title_color": "#721c24",
+    },
+    "important": {
+        "border_color": "#6610f2",
+        "title_background": "#f0e8ff",
+        "title_color": "#3a0845",
+    },
+    "see also": {
+        "border_color": "#17a2b8",
+        "title_background": "#e8f7fa",
+        "title_color": "#0c5460",
+    },
+    "attention": {
+        "border_color": "#fd7e14",
+        "title_background": "#fef2e7",
+        "title_color": "#7a3b0e",
+    },
+    "hint": {
+        "border_color": "#17a2b8",
+        "title_background": "#e8f7fa",
+        "title_color": "#0c5460",
+    },
+    "error": {
+        "border_color": "#dc3545",
+        "title_background": "#fce8e8",
+        "title_color": "#721c24",
+    },
+}
+
+DEFAULT_ADMONITION_STYLE = {
+    "border_color": "#6c757d",
+    "title_background": "#f8f9fa",
+    "title_color": "#495057",
+}
+
+WHOLE_CODE_BLOCK_STYLE = (
+    "border: 2px solid #22c55e; "
+    "border-radius: 6px; "
+    "margin: 1em 0; "
+    "overflow: hidden; "
+    "background-color: white;"
+)
+
+WHOLE_CODE_BLOCK_EXPLANATION_STYLE = (
+    "background-color: #dcfce7; "
+    "color: #166534; "
+    "padding: 0.5em 1em; "
+    "border-top: 1px solid #22c55e; "
+    "font-size: 0.9em; "
+    "font-family: Arial, sans-serif; "
+    "margin: 0;"
+)
+
+
+class CanvasHTMLTranslator(HTMLTranslator):
+    """HTML5 translator emitting inline-styled markup for Canvas LMS"""
+
+    def __init__(
+        self,
+        document: nodes.document,
+        pygments_processor: PygmentsProcessor | None = None,
+    ) -> None:
+        super().__init__(document)
+        self.pygments_processor = pygments_processor or create_pygments_processor()
+
+    def visit_canvas_admonition(self, node: canvas_admonition) -> None:
+        """Open a styled admonition: title banner followed by a content area"""
+        title = node["title"]
+        title_lower = title.lower()
+        styles = ADMONITION_STYLES.get(title_lower, DEFAULT_ADMONITION_STYLE)
+
+        # White background with colored border
+        admonition_style = (
+            f"background-color: white; "
+            f"border: 1px solid {styles['border_color']}; "
+            f"border-left: 4px solid {styles['border_color']}; "
+            f"color: #333333; "
+            f"margin: 1em 0; "
+            f"padding: 0; "
+            f"border-radius: 4px; "
+            f"font-family: Arial, sans-serif; "
+            f"overflow: hidden;"
+        )
+
+        # Title banner with colored background
+        title_style = (
+            f"background-color: {styles['title_background']}; "
+            f"color: {styles['title_color']}; "
+            f"font-weight: bold; "
+            f"margin: 0; "
+            f"padding: 0.5em 1em; "
+            f"font-size: 1em; "
+            f"line-height: 1.2; "
+            f"border-bottom: 1px solid {styles['border_color']};"
+        )
+
+        # Content area styling
+        content_style = "padding: 0.5em 1em; " "margin: 0; " "background-color: white;"
+
+        self.body.append(
+            f'<div class="admonition {self.attval(title_lower)}" style="{admonition_style}">'
+            f'<p class="admonition-title" style="{title_style}">{self.encode(title)}</p>'
+            f'<div class="admonition-content" style="{content_style}">\n'
+        )
+
+    def depart_canvas_admonition(self, node: canvas_admonition) -> None:
+        self.body.append("</div></div>\n")
+
+    def visit_whole_code_block(self, node: whole_code_block) -> None:
+        """Open the green-bordered frame around a whole code block"""
+        self.body.append(
+            f'<div class="whole-code-block" style="{WHOLE_CODE_BLOCK_STYLE}">'
+        )
+
+    def depart_whole_code_block(self, node: whole_code_block) -> None:
+        """Close the frame with the explanatory banner"""
+        self.body.append(
+            f'<div class="whole-code-block-explanation" '
+            f'style="{WHOLE_CODE_BLOCK_EXPLANATION_STYLE}">'
+            f'<p style="margin: 0;">{self.encode(node["explanation"])}</p>'
+            f"</div>"
+            f"</div>\n"
+        )
+
+    def visit_literal_block(self, node: nodes.literal_block) -> None:
+        """Highlight code blocks with Pygments straight from the doctree"""
+        classes = node["classes"]
+        if (
+            not self.pygments_processor.available
+            or len(classes) < 2
+            or classes[0] != "code"
+        ):
+            super().visit_literal_block(node)
+            return
+
+        fragment = self.pygments_processor.highlight_code(
+            " ".join(classes[1:]), node.astext()
+        )
+        if isinstance(node.parent, whole_code_block):
+            # The explanation banner follows the code directly
+            self.body.append(fragment.rstrip("\n"))
+        else:
+            self.body.append(fragment + "\n")
+        raise nodes.SkipNode
+
+    def depart_literal_block(self, node: nodes.literal_block) -> None:
+        if isinstance(node.parent, whole_code_block):
+            # The explanation banner follows the code directly
+            if "code" in node["classes"]:
+                self.body.append("</code>")
+            self.body.append("</pre>")
+            return
+        super().depart_literal_block(node)
+
+
+class CanvasHTMLWriter(Writer):
+    """HTML5 writer using the Canvas translator.
+
+    Pass a PygmentsProcessor to share its highlight cache across documents.
+    """
+
+    def __init__(
+        self,
+        pygments_processor: PygmentsProcessor | None = None,
+        profiler: Profiler | NullProfiler = NULL_PROFILER,
+    ) -> None:
+        super().__init__()
+        self.profiler = profiler
+        self.translator_class = partial(
+            CanvasHTMLTranslator, pygments_processor=pygments_processor
+        )
+
+    def translate(self) -> None:
+        with self.profiler.stage("write"):
+            super().translate()
@@ -0,0 +1,209 @@
+"""
+Persistent build manifest for incremental RST to HTML conversion
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+MANIFEST_FILENAME = ".rst_to_html_manifest.json"
+
+# Bump whenever a change to the pipeline alters the generated HTML in a way
+# the source fingerprint below would not catch (e.g. a dependency upgrade or
+# a change to a module outside PIPELINE_MODULES).
+PIPELINE_VERSION = "1"
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex digest used for every hash in the manifest"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Path) -> str | None:
+    """Hash a file's contents, or return None if it cannot be read"""
+    try:
+        return hash_bytes(path.read_bytes())
+    except OSError:
+        return None
+
+
+def hash_settings(settings: dict[str, Any]) -> str:
+    """Hash a docutils settings dictionary"""
+    return hash_bytes(json.dumps(settings, sort_keys=True, default=str).encode())
+
+
+# Modules whose code decides the generated HTML. Tooling such as the CLI,
+# the watcher or the benchmark can change without invalidating every page.
+PIPELINE_MODULES = (
+    "config.py",
+    "converter.py",
+    "html_processor.py",
+    "html_rewriter.py",
+    "html_writer.py",
+    "pygments_processor.py",
+    "sphinx_directives.py",
+)
+
+
+def pipeline_fingerprint() -> str:
+    """Fingerprint of the converter itself: its version and pipeline sources"""
+    digest = hashlib.sha256(PIPELINE_VERSION.encode())
+    package = Path(__file__).parent
+    for name in PIPELINE_MODULES:
+        digest.update(name.encode())
+        digest.update((package / name).read_bytes())
+    return digest.hexdigest()
+
+
+def normalize_dependency(path: str | Path) -> str:
+    """Normalize a recorded dependency path so equal files compare equal"""
+    return Path(os.path.normpath(path)).as_posix()
+
+
+@dataclass
+class PageRecord:
+    """Manifest entry for a single converted page"""
+
+    source_hash: str
+    output: str  # Output path relative to the output directory
+    dependencies: dict[str, str | None] = field(default_factory=dict)
+
+
+class BuildManifest:
+    """Tracks which pages are up to date with respect to their inputs"""
+
+    def __init__(self, path: Path, settings_hash: str, pipeline_hash: str):
+        self.path = path
+        self.settings_hash = settings_hash
+        self.pipeline_hash = pipeline_hash
+        self.pages: dict[str, PageRecord] = {}
+        # Output path -> hash of the final HTML last written there
+        self.outputs: dict[str, str] = {}
+        self._dependency_hashes: dict[str, str | None] = {}
+
+    @classmethod
+    def load(
+        cls, output_dir: Path, settings: dict[str, Any]
+    ) -> BuildManifest:
+        """Load the manifest from the output directory.
+
+        Pages are only restored when the settings and pipeline hashes match,
+        so changing either forces a full rebuild. Output hashes describe the
+        files on disk and are always restored.
+        """
+        manifest = cls(
+            output_dir / MANIFEST_FILENAME,
+            hash_settings(settings),
+            pipeline_fingerprint(),
+        )
+
+        try:
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return manifest
+
+        outputs = data.get("outputs", {})
+        if isinstance(outputs, dict):
+            manifest.outputs = dict(outputs)
+
+        if (
+            data.get("settings_hash") == manifest.settings_hash
+            and data.get("pipeline_hash") == manifest.pipeline_hash
+        ):
+            for source, record in data.get("pages", {}).items():
+                try:
+                    manifest.pages[source] = PageRecord(**record)
+                except TypeError:
+                    continue
+
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest to disk"""
+        data = {
+            "settings_hash": self.settings_hash,
+            "pipeline_hash": self.pipeline_hash,
+            "pages": {
+                source: asdict(record)
+                for source, record in sorted(self.pages.items())
+            },
+            "outputs": dict(sorted(self.outputs.items())),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def dependency_hash(self, dependency: str) -> str | None:
+        """Hash a dependency, reusing the result for the rest of the build"""
+        if dependency not in self._dependency_hashes:
+            self._dependency_hashes[dependency] = hash_file(Path(dependency))
+        return self._dependency_hashes[dependency]
+
+    def is_up_to_date(self, source: str, source_hash: str, output_dir: Path) -> bool:
+        """Check whether a page can be skipped"""
+        record = self.pages.get(source)
+        if record is None or record.source_hash != source_hash:
+            return False
+
+        if not (output_dir / record.output).exists():
+            return False
+
+        return all(
+            self.dependency_hash(dependency) == digest
+            for dependency, digest in record.dependencies.items()
+        )
+
+    def record(
+        self,
+        source: str,
+        source_hash: str,
+        output: str,
+        dependencies: Iterable[str],
+    ) -> None:
+        """Record a successfully converted page"""
+        self.pages[source] = PageRecord(
+            source_hash=source_hash,
+            output=output,
+            dependencies={
+                dependency: self.dependency_hash(dependency)
+                for dependency in dependencies
+            },
+        )
+
+    def record_output(self, output: str, output_hash: str) -> str | None:
+        """Store the hash of a written output and return the previous one"""
+        previous = self.outputs.get(output)
+        self.outputs[output] = output_hash
+        return previous
+
+    def forget(self, source: str) -> None:
+        """Drop a page so it is rebuilt next time"""
+        self.pages.pop(source, None)
+
+    def remove_stale(self, sources: dict[str, str], output_dir: Path) -> list[Path]:
+        """Delete outputs that no current source produces and return their paths
+
+        sources maps every current source to its output. Stale files are
+        found among the recorded outputs rather than the pages, since pages
+        are dropped when the settings or pipeline change while the files
+        they wrote stay on disk.
+        """
+        for source in [source for source in self.pages if source not in sources]:
+            del self.pages[source]
+
+        written = set(self.outputs) | {record.output for record in self.pages.values()}
+        removed: list[Path] = []
+        for output in sorted(written - set(sources.values())):
+            self.outputs.pop(output, None)
+            output_file = output_dir / output
+            if output_file.exists():
+                output_file.unlink()
+                removed.append(output_file)
+
+        return removed
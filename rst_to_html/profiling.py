@@ -0,0 +1,199 @@
+"""
+Per-file and per-stage profiling for the RST to HTML pipeline
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+_NULL_CONTEXT = nullcontext()
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements of one pipeline stage.
+
+    Times are inclusive of nested stages. ``allocated`` sums, over all calls,
+    the peak traced memory above what was allocated when the call started.
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    allocated: int = 0
+
+    def add(self, seconds: float, allocated: int) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.allocated += allocated
+
+
+@dataclass
+class FileStats:
+    """Measurements of converting one source file"""
+
+    path: str
+    seconds: float = 0.0
+    allocated: int = 0
+    stages: dict[str, float] = field(default_factory=dict)  # Stage -> seconds
+
+
+class NullProfiler:
+    """Profiler stand-in that records nothing; used when profiling is off"""
+
+    enabled = False
+
+    def stage(self, name: str):
+        return _NULL_CONTEXT
+
+    def file(self, path: str | Path):
+        return _NULL_CONTEXT
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """Records wall time and allocated bytes per file and per stage.
+
+    Stages nest: ``parse`` and ``write`` run inside a file, ``highlight`` inside
+    ``write``. Memory is measured with tracemalloc, which slows the run down;
+    compare profiles with each other rather than with unprofiled builds.
+    """
+
+    enabled = True
+
+    def __init__(self, track_memory: bool = True, use_cprofile: bool = False):
+        self.track_memory = track_memory
+        self.stages: dict[str, StageStats] = {}
+        self.files: list[FileStats] = []
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        self.total_seconds = 0.0
+        self._current_file: FileStats | None = None
+        # [allocated at start, highest peak seen so far] per open measurement
+        self._memory_stack: list[list[int]] = []
+        self._started_at: float | None = None
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        """Begin a profiling session"""
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        self._started_at = time.perf_counter()
+
+    def stop(self) -> None:
+        """End the profiling session"""
+        if self._started_at is not None:
+            self.total_seconds += time.perf_counter() - self._started_at
+            self._started_at = None
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _memory_enter(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._memory_stack:
+            outer = self._memory_stack[-1]
+            outer[1] = max(outer[1], peak)
+        tracemalloc.reset_peak()
+        self._memory_stack.append([current, current])
+
+    def _memory_exit(self) -> int:
+        if not tracemalloc.is_tracing() or not self._memory_stack:
+            return 0
+        start, running_peak = self._memory_stack.pop()
+        peak = max(running_peak, tracemalloc.get_traced_memory()[1])
+        if self._memory_stack:
+            outer = self._memory_stack[-1]
+            outer[1] = max(outer[1], peak)
+        return peak - start
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure one call of a pipeline stage"""
+        self._memory_enter()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            allocated = self._memory_exit()
+            self.stages.setdefault(name, StageStats()).add(seconds, allocated)
+            if self._current_file is not None:
+                stages = self._current_file.stages
+                stages[name] = stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def file(self, path: str | Path) -> Iterator[None]:
+        """Measure the conversion of one source file"""
+        stats = FileStats(path=Path(path).as_posix())
+        self._current_file = stats
+        self._memory_enter()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.seconds = time.perf_counter() - start
+            stats.allocated = self._memory_exit()
+            self._current_file = None
+            self.files.append(stats)
+
+    def report(self, top: int = 15) -> str:
+        """Text report of the slowest stages and files"""
+        lines = [
+            f"⏱️  Profile: {len(self.files)} files in {self.total_seconds * 1000:.1f} ms"
+            " (stage times include nested stages)",
+            "",
+            f"{'Stage':<24}{'Calls':>8}{'Total ms':>11}{'Mean ms':>10}"
+            f"{'Max ms':>10}{'Alloc MB':>10}",
+        ]
+        stages = sorted(self.stages.items(), key=lambda item: -item[1].seconds)
+        for name, stats in stages[:top]:
+            lines.append(
+                f"{name:<24}{stats.calls:>8}{stats.seconds * 1000:>11.1f}"
+                f"{stats.seconds * 1000 / stats.calls:>10.2f}"
+                f"{stats.max_seconds * 1000:>10.2f}"
+                f"{stats.allocated / 1_048_576:>10.2f}"
+            )
+
+        lines += ["", f"{'Slowest files':<48}{'ms':>9}{'Alloc MB':>10}"]
+        for stats in sorted(self.files, key=lambda item: -item.seconds)[:top]:
+            lines.append(
+                f"{stats.path:<48}{stats.seconds * 1000:>9.1f}"
+                f"{stats.allocated / 1_048_576:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializable form of every measurement"""
+        return {
+            "total_seconds": self.total_seconds,
+            "stages": {name: asdict(stats) for name, stats in self.stages.items()},
+            "files": [asdict(stats) for stats in self.files],
+        }
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    def write_pstats(self, path: Path) -> None:
+        """Dump cProfile data, readable with ``python -m pstats``"""
+        if self.cprofile is None:
+            raise ValueError("Profiler was created without cProfile support")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.cprofile.dump_stats(str(path))
@@ -5,6 +5,10 @@ Pygments-based code highlighting processor for inline styles
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+
+from .highlight_cache import HighlightCache
+from .profiling import NULL_PROFILER, NullProfiler, Profiler
 
 try:
     from pygments import highlight
@@ -16,76 +20,77 @@ try:
 except ImportError:
     PYGMENTS_AVAILABLE = False
 
+# Language names that map onto a different Pygments lexer
+_LANGUAGE_ALIASES = {
+    "c++": "cpp",
+    "arduino": "cpp",
+    "py": "python",
+    "js": "javascript",
+}
+
+
+@lru_cache(maxsize=64)
+def get_lexer(language: str):
+    """Lexer for a code block language, built once per language.
+
+    Unknown languages fall back to plain text.
+    """
+    name = language.lower()
+    name = _LANGUAGE_ALIASES.get(name, name)
+    try:
+        return get_lexer_by_name(name, stripall=True)
+    except ClassNotFound:
+        return get_lexer_by_name("text", stripall=True)
+
+
+@lru_cache(maxsize=8)
+def get_formatter(style: str):
+    """Inline-styled HTML formatter shared by every processor using a style"""
+    return HtmlFormatter(
+        style=style,
+        linenos=False,  # Disable line numbers
+        cssclass="highlight",
+        wrapcode=True,
+        noclasses=True,  # This generates inline styles
+        nobackground=False,
+        anchorlinenos=False,
+    )
+
 
 class PygmentsProcessor:
     """Process code blocks with Pygments for inline styling"""
 
-    def __init__(self, style: str = "xcode", line_numbers: bool = False):
+    def __init__(
+        self,
+        style: str = "xcode",
+        line_numbers: bool = False,
+        cache: HighlightCache | None = None,
+        profiler: Profiler | NullProfiler = NULL_PROFILER,
+    ):
         self.style = style
         self.line_numbers = line_numbers
+        self.cache = cache
+        self.profiler = profiler
         self.formatter = None
 
         if PYGMENTS_AVAILABLE:
-            self.formatter = HtmlFormatter(
-                style=self.style,
-                linenos=False,  # Disable line numbers
-                cssclass="highlight",
-                wrapcode=True,
-                noclasses=True,  # This generates inline styles
-                nobackground=False,
-                anchorlinenos=False,
-            )
+            self.formatter = get_formatter(self.style)
+
+    @property
+    def available(self) -> bool:
+        """Whether Pygments is installed and a formatter could be created"""
+        return PYGMENTS_AVAILABLE and self.formatter is not None
 
     def process_html_code_blocks(self, html_content: str) -> str:
         """Process all code blocks in HTML content with Pygments highlighting"""
-        if not PYGMENTS_AVAILABLE or not self.formatter:
+        if not self.available:
             return html_content
 
         # Pattern to match code blocks with language class
         code_pattern = r'<pre class="code ([^"]+) literal-block"[^>]*><code[^>]*>(.*?)</code></pre>'
 
         def replace_code_block(match):
-            language = match.group(1).strip()
-            code_content = match.group(2)
-
-            # Decode HTML entities in code content
-            code_content = self._decode_html_entities(code_content)
-
-            # Remove any existing HTML tags from code content
-            code_content = re.sub(r"<[^>]+>", "", code_content)
-
-            try:
-                # Get lexer for the language
-                if language.lower() in ["cpp", "c++", "arduino"]:
-                    lexer = get_lexer_by_name("cpp", stripall=True)
-                elif language.lower() in ["c"]:
-                    lexer = get_lexer_by_name("c", stripall=True)
-                elif language.lower() in ["python", "py"]:
-                    lexer = get_lexer_by_name("python", stripall=True)
-                elif language.lower() in ["javascript", "js"]:
-                    lexer = get_lexer_by_name("javascript", stripall=True)
-                elif language.lower() in ["html"]:
-                    lexer = get_lexer_by_name("html", stripall=True)
-                elif language.lower() in ["css"]:
-                    lexer = get_lexer_by_name("css", stripall=True)
-                else:
-                    # Try to guess the lexer or fall back to text
-                    try:
-                        lexer = get_lexer_by_name(language, stripall=True)
-                    except ClassNotFound:
-                        lexer = get_lexer_by_name("text", stripall=True)
-
-                # Highlight the code
-                highlighted = highlight(code_content, lexer, self.formatter)
-
-                # Apply additional styling to match hilite.me style
-                highlighted = self._apply_hilite_style(highlighted)
-
-                return highlighted
-
-            except Exception:
-                # If highlighting fails, return original content with basic styling
-                return self._create_fallback_code_block(code_content)
+            return self.highlight_block(match.group(1), match.group(2))
 
         # Replace all code blocks
         processed_html = re.sub(
@@ -94,6 +99,47 @@ class PygmentsProcessor:
 
         return processed_html
 
+    def highlight_block(self, language: str, code_content: str) -> str:
+        """Highlight the HTML content of one ``<code>`` element"""
+        language = language.strip()
+
+        # Decode HTML entities in code content
+        code_content = self._decode_html_entities(code_content)
+
+        # Remove any existing HTML tags from code content
+        code_content = re.sub(r"<[^>]+>", "", code_content)
+
+        return self.highlight_code(language, code_content)
+
+    def highlight_code(self, language: str, code: str) -> str:
+        """Highlight plain source code, e.g. the text of a literal_block node"""
+        with self.profiler.stage("highlight"):
+            return self._highlight_code(language.strip(), code)
+
+    def _highlight_code(self, language: str, code: str) -> str:
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(language, self.style, code)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            with self.profiler.stage("highlight.pygments"):
+                # Highlight the code
+                highlighted = highlight(code, get_lexer(language), self.formatter)
+
+                # Apply additional styling to match hilite.me style
+                highlighted = self._apply_hilite_style(highlighted)
+
+        except Exception:
+            # If highlighting fails, return original content with basic styling
+            return self._create_fallback_code_block(code)
+
+        if key is not None:
+            self.cache.put(key, highlighted)
+        return highlighted
+
     def _decode_html_entities(self, html_text: str) -> str:
         """Decode common HTML entities"""
         html_text = html_text.replace("&lt;", "<")
@@ -142,6 +188,11 @@ class PygmentsProcessor:
 </div>"""
 
 
-def create_pygments_processor() -> PygmentsProcessor:
+def create_pygments_processor(
+    cache: HighlightCache | None = None,
+    profiler: Profiler | NullProfiler = NULL_PROFILER,
+) -> PygmentsProcessor:
     """Factory function to create a PygmentsProcessor"""
-    return PygmentsProcessor(style="xcode", line_numbers=False)
+    return PygmentsProcessor(
+        style="xcode", line_numbers=False, cache=cache, profiler=profiler
+    )
@@ -10,83 +10,71 @@ from docutils.parsers.rst import Directive, directives
 from docutils.statemachine import ViewList
 
 
+WHOLE_CODE_BLOCK_EXPLANATION = (
+    "This is a whole code block. It can be copy pasted by itself in your Arduino IDE."
+)
+
+
+class canvas_admonition(nodes.General, nodes.Element):
+    """Admonition rendered as a Canvas-styled box by the HTML writer.
+
+    Attributes: ``title`` - the display title (e.g. "See Also").
+    """
+
+
+class whole_code_block(nodes.General, nodes.Element):
+    """A copy-pasteable code block with a green frame and explanatory banner.
+
+    Contains a single literal block. Attributes: ``explanation`` - banner text.
+    """
+
+
 class AdmonitionDirective(Directive):
-    """Handle admonition directives like note, tip, warning as styled blockquotes"""
+    """Handle admonition directives like note, tip, warning as Canvas-styled boxes"""
 
     has_content: bool = True
     optional_arguments: int = 1
     final_argument_whitespace: bool = True
     option_spec: dict[str, object] = {}
 
+    # Create title mapping
+    title_map: dict[str, str] = {
+        "note": "Note",
+        "tip": "Tip",
+        "warning": "Warning",
+        "caution": "Caution",
+        "danger": "Danger",
+        "important": "Important",
+        "seealso": "See Also",
+        "attention": "Attention",
+        "hint": "Hint",
+        "error": "Error",
+    }
+
     def run(self) -> list[nodes.Node]:
-        """Create blockquote with inline styles for Canvas compatibility"""
+        """Create an admonition node; styling is applied by the HTML writer"""
         admonition_type = self.name.lower()
+        title_text = self.title_map.get(admonition_type, admonition_type.title())
 
-        # Create a blockquote container with inline styles
-        blockquote = nodes.block_quote()
-
-        # Define styles for different admonition types
-        style_map = {
-            "note": "background-color: #e7f3ff; border-left: 4px solid #007bff; color: #004085;",
-            "tip": "background-color: #e8f5e8; border-left: 4px solid #28a745; color: #155724;",
-            "warning": "background-color: #fff8e1; border-left: 4px solid #ffc107; color: #856404;",
-            "caution": "background-color: #fef2e7; border-left: 4px solid #fd7e14; color: #7a3b0e;",
-            "danger": "background-color: #fce8e8; border-left: 4px solid #dc3545; color: #721c24;",
-            "important": "background-color: #f0e8ff; border-left: 4px solid #6610f2; color: #3a0845;",
-            "seealso": "background-color: #e8f7fa; border-left: 4px solid #17a2b8; color: #0c5460;",
-            "attention": "background-color: #fef2e7; border-left: 4px solid #fd7e14; color: #7a3b0e;",
-            "hint": "background-color: #e8f7fa; border-left: 4px solid #17a2b8; color: #0c5460;",
-            "error": "background-color: #fce8e8; border-left: 4px solid #dc3545; color: #721c24;",
-        }
-
-        base_style = "margin: 1em 0; padding: 12px; border-radius: 4px; font-family: Arial, sans-serif;"
-        admonition_style = base_style + style_map.get(
-            admonition_type,
-            "background-color: #f8f9fa; border-left: 4px solid #6c757d; color: #495057;",
-        )
+        admonition = canvas_admonition(title=title_text)
 
-        # Add the style attribute to the blockquote
-        blockquote.attributes["style"] = admonition_style
-
-        # Create title mapping
-        title_map = {
-            "note": "Note",
-            "tip": "Tip",
-            "warning": "Warning",
-            "caution": "Caution",
-            "danger": "Danger",
-            "important": "Important",
-            "seealso": "See Also",
-            "attention": "Attention",
-            "hint": "Hint",
-            "error": "Error",
-        }
-
-        title_text = title_map.get(admonition_type, admonition_type.title())
-
-        # Create the first paragraph with bold title
-        title_para = nodes.paragraph()
-        title_para.attributes["style"] = "margin: 0 0 8px 0; font-weight: bold;"
-        title_strong = nodes.strong()
-        title_strong += nodes.Text(f"{title_text}:")
-        title_para += title_strong
-
-        # Add the title paragraph to blockquote
-        blockquote += title_para
-
-        # If we have content, parse and add it as separate paragraphs
+        # Parse the content directly into the admonition
         if self.content:
-            # Parse the content into a temporary container
-            content_container = nodes.container()
-            self.state.nested_parse(
-                self.content, self.content_offset, content_container
-            )
+            self.state.nested_parse(self.content, self.content_offset, admonition)
+
+        return [admonition]
 
-            # Add all content as separate nodes
-            for content_node in content_container.children:
-                blockquote += content_node
 
-        return [blockquote]
+def _build_whole_code_block(code_content: str, language: str) -> whole_code_block:
+    """Wrap code in a whole code block node"""
+    # Create a literal block (code block)
+    code_block = nodes.literal_block(code_content, code_content)
+    code_block["classes"] = ["code", language]
+    code_block["xml:space"] = "preserve"
+
+    block = whole_code_block(explanation=WHOLE_CODE_BLOCK_EXPLANATION)
+    block += code_block
+    return block
 
 
 class SilentDirective(Directive):
@@ -182,54 +170,7 @@ class WholeCodeBlockDirective(Directive):
         # Get the language from the first argument
         language = self.arguments[0] if self.arguments else "text"
 
-        # Create the container div for the whole code block
-        container = nodes.container()
-        container.attributes["style"] = (
-            "border: 2px solid #22c55e; "
-            "border-radius: 6px; "
-            "margin: 1em 0; "
-            "overflow: hidden; "
-            "background-color: white;"
-        )
-
-        # Create the code block
-        code_content = "\n".join(self.content)
-
-        # Create a literal block (code block)
-        code_block = nodes.literal_block()
-        code_block.attributes["classes"] = ["code", language]
-        code_block.attributes["xml:space"] = "preserve"
-        code_block += nodes.Text(code_content)
-
-        # Add some styling to the code block to remove default margins
-        code_block.attributes["style"] = (
-            "margin: 0; " "border-radius: 0; " "border: none;"
-        )
-
-        container.append(code_block)
-
-        # Create the explanatory text div
-        explanation_div = nodes.container()
-        explanation_div.attributes["style"] = (
-            "background-color: #dcfce7; "
-            "color: #166534; "
-            "padding: 0.5em 1em; "
-            "border-top: 1px solid #22c55e; "
-            "font-size: 0.9em; "
-            "font-family: Arial, sans-serif;"
-        )
-
-        # Add the explanatory text
-        explanation_text = nodes.paragraph()
-        explanation_text.attributes["style"] = "margin: 0;"
-        explanation_text += nodes.Text(
-            "This is a whole code block. It can be copy pasted by itself in your Arduino IDE."
-        )
-
-        explanation_div.append(explanation_text)
-        container.append(explanation_div)
-
-        return [container]
+        return [_build_whole_code_block("\n".join(self.content), language)]
 
 
 class WholeLiteralIncludeDirective(Directive):
@@ -263,56 +204,15 @@ class WholeLiteralIncludeDirective(Directive):
         source_dir = Path(self.state.document.attributes.get("source", ".")).parent
         file_path = source_dir / include_file_path
 
+        # Record the included file so incremental builds notice when it changes
+        self.state.document.settings.record_dependencies.add(file_path)
+
         try:
             # Read the file content
             with open(file_path, "r", encoding=encoding) as f:
                 file_content = f.read()
 
-            # Create the container div for the whole code block
-            container = nodes.container()
-            container.attributes["style"] = (
-                "border: 2px solid #22c55e; "
-                "border-radius: 6px; "
-                "margin: 1em 0; "
-                "overflow: hidden; "
-                "background-color: white;"
-            )
-
-            # Create a literal block (code block) with the file content
-            code_block = nodes.literal_block()
-            code_block.attributes["classes"] = ["code", language]
-            code_block.attributes["xml:space"] = "preserve"
-            code_block += nodes.Text(file_content)
-
-            # Add some styling to the code block to remove default margins
-            code_block.attributes["style"] = (
-                "margin: 0; " "border-radius: 0; " "border: none;"
-            )
-
-            container.append(code_block)
-
-            # Create the explanatory text div
-            explanation_div = nodes.container()
-            explanation_div.attributes["style"] = (
-                "background-color: #dcfce7; "
-                "color: #166534; "
-                "padding: 0.5em 1em; "
-                "border-top: 1px solid #22c55e; "
-                "font-size: 0.9em; "
-                "font-family: Arial, sans-serif;"
-            )
-
-            # Add the explanatory text
-            explanation_text = nodes.paragraph()
-            explanation_text.attributes["style"] = "margin: 0;"
-            explanation_text += nodes.Text(
-                "This is a whole code block. It can be copy pasted by itself in your Arduino IDE."
-            )
-
-            explanation_div.append(explanation_text)
-            container.append(explanation_div)
-
-            return [container]
+            return [_build_whole_code_block(file_content, language)]
 
         except FileNotFoundError:
             # If file not found, create an error message
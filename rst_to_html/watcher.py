@@ -0,0 +1,224 @@
+"""
+Watch mode: reconvert pages as their sources change
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from .converter import RSTConverter
+
+DEFAULT_POLL_INTERVAL = 0.5  # Seconds between scans while idle
+DEFAULT_DEBOUNCE = 0.2  # Quiet period that ends a burst of changes
+
+
+@dataclass
+class FileChanges:
+    """Files added, modified and removed since the previous scan"""
+
+    added: set[Path] = field(default_factory=set)
+    modified: set[Path] = field(default_factory=set)
+    removed: set[Path] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+    @property
+    def paths(self) -> set[Path]:
+        """Every changed path"""
+        return self.added | self.modified | self.removed
+
+    def merge(self, other: FileChanges) -> None:
+        """Fold a later scan into this one"""
+        for path in other.added:
+            # Removed then re-created files count as modified
+            if path in self.removed:
+                self.removed.discard(path)
+                self.modified.add(path)
+            else:
+                self.added.add(path)
+        for path in other.removed:
+            if path in self.added:
+                self.added.discard(path)
+            else:
+                self.modified.discard(path)
+                self.removed.add(path)
+        self.modified |= other.modified - self.added
+
+
+def _is_ignored_name(name: str) -> bool:
+    """Hidden files, editor backups and build directories are never watched"""
+    return name.startswith((".", "_build")) or name.endswith("~")
+
+
+class FileWatcher:
+    """Detects file changes by comparing (mtime, size) snapshots of directory trees.
+
+    Polling needs no third-party dependency and behaves the same on every
+    platform; scanning the documentation tree takes well under a millisecond.
+    """
+
+    def __init__(self, roots: Iterable[Path], ignore: Iterable[Path] = ()):
+        self.ignore = {Path(path).resolve() for path in ignore}
+        self.roots: list[Path] = []
+        self._snapshot: dict[Path, tuple[int, int]] = {}
+        self.set_roots(roots)
+
+    def set_roots(self, roots: Iterable[Path]) -> None:
+        """Change the watched directories without reporting their files as new"""
+        self.roots = sorted({Path(root).resolve() for root in roots})
+        self._snapshot = self.scan()
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        """Snapshot every watched file"""
+        snapshot: dict[Path, tuple[int, int]] = {}
+        stack = [root for root in self.roots if root.is_dir()]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if _is_ignored_name(entry.name):
+                            continue
+                        path = Path(entry.path)
+                        if entry.is_dir(follow_symlinks=False):
+                            if path not in self.ignore:
+                                stack.append(path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                # Directory vanished while scanning
+                continue
+        return snapshot
+
+    def poll(self) -> FileChanges:
+        """Return the changes since the previous poll"""
+        snapshot = self.scan()
+        previous = self._snapshot
+        self._snapshot = snapshot
+
+        changes = FileChanges()
+        for path, state in snapshot.items():
+            old_state = previous.get(path)
+            if old_state is None:
+                changes.added.add(path)
+            elif old_state != state:
+                changes.modified.add(path)
+        changes.removed = previous.keys() - snapshot.keys()
+        return changes
+
+
+class WatchBuilder:
+    """Keeps a converter warm and reconverts only the pages affected by edits.
+
+    Directives, the highlighter and compiled patterns are set up once; every
+    rebuild after the initial one goes through the dependency graph.
+    """
+
+    def __init__(
+        self,
+        converter: RSTConverter,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ):
+        self.converter = converter
+        self.config = converter.config
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.source_dir = self.config.source_dir.resolve()
+        self.static_dirs = [
+            self.source_dir / static_dir for static_dir in self.config.static_dirs
+        ]
+        self.watcher = FileWatcher(
+            self.watch_roots(), ignore=[self.config.output_dir]
+        )
+
+    def watch_roots(self) -> list[Path]:
+        """The source tree plus every directory holding an included file"""
+        roots = {self.source_dir}
+        for dependency in self.converter.dependency_graph.as_dict():
+            path = Path(dependency)
+            if not path.is_relative_to(self.source_dir):
+                roots.add(path.parent)
+
+        # Nested directories are already covered by their ancestors
+        return sorted(
+            root
+            for root in roots
+            if not any(root != other and root.is_relative_to(other) for other in roots)
+        )
+
+    def run(self) -> None:
+        """Watch until interrupted with Ctrl+C"""
+        print(f"👀 Watching {', '.join(str(root) for root in self.watcher.roots)}")
+        print("Press Ctrl+C to stop")
+        try:
+            while True:
+                changes = self.wait_for_changes()
+                self.rebuild(changes)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+
+    def wait_for_changes(self) -> FileChanges:
+        """Block until files change, then until the burst of changes settles"""
+        changes = self.watcher.poll()
+        while not changes:
+            time.sleep(self.poll_interval)
+            changes = self.watcher.poll()
+
+        # Editors often write a file in several steps; wait for a quiet period
+        while True:
+            time.sleep(self.debounce)
+            later = self.watcher.poll()
+            if not later:
+                return changes
+            changes.merge(later)
+
+    def rebuild(self, changes: FileChanges) -> tuple[int, int]:
+        """Reconvert the pages affected by a set of changes"""
+        start = time.perf_counter()
+
+        static_changed = any(
+            path.is_relative_to(static_dir)
+            for path in changes.paths
+            for static_dir in self.static_dirs
+        )
+        if static_changed:
+            self.converter.sync_static_and_export()
+
+        pages_added_or_removed = any(
+            path.suffix == ".rst" and path.is_relative_to(self.source_dir)
+            for path in changes.added | changes.removed
+        )
+        if pages_added_or_removed:
+            # New pages must be discovered and outputs of deleted ones removed;
+            # the manifest still skips everything unchanged
+            success_count, total_files = self.converter.convert_all_files()
+            converted = len(self.converter.results)
+        else:
+            success_count, total_files = self.converter.convert_affected_files(
+                path
+                for path in changes.paths
+                if not any(path.is_relative_to(d) for d in self.static_dirs)
+            )
+            converted = total_files
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        failed = sum(1 for result in self.converter.results if not result.success)
+        status = "⚠️ " if failed else "🔄"
+        print(
+            f"{status} Rebuilt {converted} page(s) in {elapsed_ms:.0f} ms"
+            + (f" ({failed} failed)" if failed else "")
+        )
+
+        # Included files may have moved to new directories
+        roots = self.watch_roots()
+        if roots != self.watcher.roots:
+            self.watcher.set_roots(roots)
+
+        return success_count, total_files
@@ -0,0 +1,69 @@
+"""What the build cache key covers."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from quiz_to_qti import build_cache
+from quiz_to_qti.build_cache import build_key
+from quiz_to_qti.qti_writer import load_config
+
+QUIZ = """### Which part is shown?
+
+![Servo](images/servo.png "A servo")
+
+1. [x] A servo
+1. [ ] An LED
+"""
+
+
+@pytest.fixture
+def quiz(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # Image paths resolve against the working directory, as in text2qti
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "servo.png").write_bytes(b"servo v1")
+    path = tmp_path / "servo_quiz.md"
+    path.write_text(QUIZ, encoding="utf-8")
+    return path
+
+
+def _key(quiz: Path, **config: object) -> str:
+    return build_key(
+        [quiz],
+        title="Servo",
+        description=None,
+        shuffle_answers=True,
+        show_correct=True,
+        engine="builtin",
+        config={**load_config(), **config},
+    )
+
+
+def test_key_is_stable(quiz: Path) -> None:
+    assert _key(quiz) == _key(quiz)
+
+
+def test_key_covers_referenced_images(quiz: Path) -> None:
+    before = _key(quiz)
+    (quiz.parent / "images" / "servo.png").write_bytes(b"servo v2")
+    changed = _key(quiz)
+    (quiz.parent / "images" / "servo.png").unlink()
+
+    assert len({before, changed, _key(quiz)}) == 3
+
+
+def test_key_covers_the_text2qti_config(quiz: Path) -> None:
+    assert _key(quiz) != _key(quiz, pandoc_mathml=True)
+    assert _key(quiz) != _key(quiz, latex_render_url="https://canvas.example.edu/")
+
+
+def test_key_covers_the_converter_source(
+    quiz: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    before = _key(quiz)
+    monkeypatch.setattr(build_cache, "CONVERTER_FINGERPRINT", "edited")
+
+    assert _key(quiz) != before
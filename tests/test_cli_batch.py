@@ -0,0 +1,54 @@
+"""The batch command, run through click."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import pytest
+from click.testing import CliRunner, Result
+
+from quiz_to_qti import cli
+
+QUIZ = """### Which pin mode reads a button?
+
+1. [x] INPUT
+1. [ ] OUTPUT
+"""
+
+
+def _batch(root: Path, out_dir: Path) -> Result:
+    return CliRunner().invoke(
+        cli.batch_cmd,
+        ["--root", str(root), "--out", str(out_dir), "--docs-root", str(root)],
+    )
+
+
+@pytest.fixture
+def quiz_root(tmp_path: Path) -> Path:
+    root = tmp_path / "quizzes"
+    (root / "buttons").mkdir(parents=True)
+    (root / "buttons" / "pin_modes_quiz.md").write_text(QUIZ, encoding="utf-8")
+    return root
+
+
+def test_builds_a_quiz(quiz_root: Path, tmp_path: Path) -> None:
+    result = _batch(quiz_root, tmp_path / "out")
+
+    assert result.exit_code == 0, result.output
+    zips: List[Path] = list((tmp_path / "out").glob("*.zip"))
+    assert len(zips) == 1
+
+
+def test_reports_a_failing_input(
+    quiz_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def broken(title: str) -> str:
+        raise OSError("quiz listing broke")
+
+    monkeypatch.setattr(cli, "_sanitize_basename", broken)
+    result = _batch(quiz_root, tmp_path / "out")
+
+    assert result.exit_code == 1
+    assert not isinstance(result.exception, AttributeError)
+    assert "input: quiz listing broke" in result.output
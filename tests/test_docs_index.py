@@ -0,0 +1,52 @@
+"""Ranking in DocsIndex, with and without NumPy."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from quiz_to_qti import docs_index
+from quiz_to_qti.docs_index import DocsIndex, tokenize
+
+QUERY = tokenize("How is a servo motor driven with PWM pulses?")
+
+
+@pytest.fixture
+def docs_root(tmp_path: Path) -> Path:
+    root = tmp_path / "docs"
+    root.mkdir()
+    # Identical files tie, and the limits below cut through the ties
+    for n in range(40):
+        (root / f"servo_{n:02d}.rst").write_text(
+            "Servo\n=====\n\nA servo motor follows PWM pulses.\n", encoding="utf-8"
+        )
+        (root / f"pwm_{n:02d}.rst").write_text(
+            "PWM\n===\n\nPWM pulses.\n", encoding="utf-8"
+        )
+    (root / "loops.rst").write_text(
+        "Loops\n=====\n\nA for loop repeats its body.\n", encoding="utf-8"
+    )
+    return root
+
+
+def _search(root: Path, limit: int) -> list[str]:
+    return [section.id for section in DocsIndex(root).search(QUERY, limit)]
+
+
+def test_ties_rank_by_path(docs_root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(docs_index, "np", None)
+
+    assert _search(docs_root, 5) == [f"servo_{n:02d}.rst#0" for n in range(5)]
+    assert _search(docs_root, 42)[40:] == ["pwm_00.rst#0", "pwm_01.rst#0"]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 13, 41, 45, 100])
+def test_numpy_and_python_rank_alike(
+    docs_root: Path, monkeypatch: pytest.MonkeyPatch, limit: int
+) -> None:
+    pytest.importorskip("numpy")
+    with_numpy = _search(docs_root, limit)
+    monkeypatch.setattr(docs_index, "np", None)
+
+    assert with_numpy == _search(docs_root, limit)
@@ -0,0 +1,41 @@
+"""Static file sync in FileUtils"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from rst_to_html.file_utils import FileUtils, SyncResult
+
+
+def _sync(tmp_path: Path, use_hardlinks: bool) -> SyncResult:
+    return FileUtils.create_output_structure(
+        tmp_path / "src", tmp_path / "out", ["images"], use_hardlinks=use_hardlinks
+    )
+
+
+def test_reports_in_place_edits_of_hardlinked_files(tmp_path: Path) -> None:
+    image = tmp_path / "src" / "images" / "servo.png"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"servo v1")
+
+    assert _sync(tmp_path, True).added == [Path("images/servo.png")]
+    assert os.path.samefile(image, tmp_path / "out" / "images" / "servo.png")
+    assert _sync(tmp_path, True).unchanged == 1
+
+    # Writing through the link edits the output too, and only the recorded
+    # stats tell that it changed
+    image.write_bytes(b"servo v2, larger")
+    assert _sync(tmp_path, True).updated == [Path("images/servo.png")]
+    assert _sync(tmp_path, True).unchanged == 1
+
+
+def test_copies_keep_no_state(tmp_path: Path) -> None:
+    image = tmp_path / "src" / "images" / "servo.png"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"servo v1")
+
+    assert _sync(tmp_path, False).added == [Path("images/servo.png")]
+    image.write_bytes(b"servo v2, larger")
+    assert _sync(tmp_path, False).updated == [Path("images/servo.png")]
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["images"]
@@ -0,0 +1,24 @@
+"""Keys of the highlight cache"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from rst_to_html import highlight_cache
+from rst_to_html.highlight_cache import HighlightCache
+from rst_to_html.manifest import hash_file
+
+
+def test_key_covers_the_highlighter(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = HighlightCache(tmp_path)
+    source = Path(highlight_cache.__file__).with_name("pygments_processor.py")
+    assert highlight_cache.HIGHLIGHTER_FINGERPRINT == hash_file(source)
+
+    key = cache.key("cpp", "xcode", "int x = 1;")
+    assert key == cache.key("cpp", "xcode", "int x = 1;")
+    monkeypatch.setattr(highlight_cache, "HIGHLIGHTER_FINGERPRINT", "edited")
+    assert key != cache.key("cpp", "xcode", "int x = 1;")
@@ -0,0 +1,111 @@
+"""HTMLProcessor.process_html against the original full-document passes"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pytest
+
+from rst_to_html.benchmark import generate_corpus, render_pages
+from rst_to_html.file_utils import FileUtils
+from rst_to_html.html_processor import HTMLProcessor
+from rst_to_html.html_writer import CanvasHTMLWriter
+from rst_to_html.sphinx_directives import register_sphinx_directives
+
+DOCS_DIR = Path(__file__).resolve().parent.parent / "docs"
+
+
+def process_html_multipass(html_content: str) -> str:
+    """The post-processing steps as separate full-document passes.
+
+    This is how HTMLProcessor.process_html worked before it became a single
+    walk; its output is the reference the rewriter has to reproduce.
+    """
+    html_content = re.sub(
+        r'<div class="system-message".*?</div>', "", html_content, flags=re.DOTALL
+    )
+    html_content = re.sub(
+        r'<div class="problematic"[^>]*>(.*?)</div>', r"\1", html_content
+    )
+    html_content = re.sub(
+        r'<span class="docutils literal[^"]*">([^<]*)</span>',
+        r'<code class="docutils literal">\1</code>',
+        html_content,
+    )
+    html_content = re.sub(r"(?s)<title[^>]*>.*?</title>\s*", "", html_content)
+    html_content = re.sub(
+        r":ref:`([^<>`]+)\s*<[^<>`]*>`", r"<strong>\1</strong>", html_content
+    )
+    html_content = re.sub(
+        r":ref:`([^<>`]+)`",
+        lambda m: f'<strong>{m.group(1).replace("_", " ").title()}</strong>',
+        html_content,
+    )
+    html_content = re.sub(
+        r":term:`([^<>`]+?)\s*<[^<>`]*>`",
+        lambda m: f"<strong>{m.group(1).strip()}</strong>",
+        html_content,
+    )
+    html_content = re.sub(
+        r":term:`([^<>`]+?)`",
+        lambda m: f"<strong>{m.group(1).strip()}</strong>",
+        html_content,
+    )
+    html_content = re.sub(
+        r'(<table[^>]*class="docutils"[^>]*>.*?</table>)',
+        r'<div class="table-wrapper">\1</div>',
+        html_content,
+        flags=re.DOTALL,
+    )
+    return html_content
+
+
+def _table(rows: int) -> str:
+    body = "".join(
+        f"<tr><td><p>See :ref:`Loops <loops>` and :term:`PWM` row {row}</p></td>"
+        '<td><span class="docutils literal"><span class="pre">x</span></span> '
+        ":ref:`arrays_and_lists`</td></tr>"
+        for row in range(rows)
+    )
+    return (
+        '<table border="1" class="docutils"><colgroup><col/></colgroup>'
+        f"<tbody>{body}</tbody></table>"
+    )
+
+
+HANDWRITTEN = [
+    "",
+    "<p>No transformations here</p>",
+    '<html><head><title>Page</title>\n  <meta charset="utf-8"/></head>'
+    '<body><span class="docutils literal">x = 1</span></body></html>',
+    '<p><span class="docutils literal"><span class="pre">a</span></span>'
+    '<span class="docutils literal notranslate">b &lt; c</span></p>',
+    '<div class="system-message"><p class="system-message-title">Error</p>'
+    "<pre>bad :ref:`x`</pre></div><p>after</p>",
+    '<p>a <div class="problematic" id="p1">:term:`PWM <pwm>`</div> b</p>',
+    '<div class="section"><p>:term:`servo <servo motor>`</p>'
+    + _table(12)
+    + '<div class="note"><p>:ref:`functions`</p></div></div>',
+    '<table class="plain"><tr><td>kept as is</td></tr></table>' + _table(2),
+    '<table border="1" class="docutils"><tr><td><p>unclosed</p></td></tr>',
+    ":ref:`Text <a>` :ref:`some_target` :term:` spaced <t>` :term:`  x  `",
+    ":ref:`broken <` :term:`also` broken` :ref:``",
+]
+
+
+@pytest.mark.parametrize("html_content", HANDWRITTEN)
+def test_matches_multipass_on_handwritten_html(html_content: str) -> None:
+    assert HTMLProcessor().process_html(html_content) == process_html_multipass(
+        html_content
+    )
+
+
+def test_matches_multipass_on_rendered_pages(tmp_path: Path) -> None:
+    register_sphinx_directives()
+    files = FileUtils.find_rst_files(DOCS_DIR) + generate_corpus(tmp_path, 1, 40)
+    processor = HTMLProcessor()
+    for html_content in render_pages(files, CanvasHTMLWriter):
+        assert processor.process_html(html_content) == process_html_multipass(
+            html_content
+        )
@@ -0,0 +1,48 @@
+"""Stale output removal in BuildManifest"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from rst_to_html.manifest import MANIFEST_FILENAME, BuildManifest
+
+
+def _build(output_dir: Path, sources: dict[str, str]) -> BuildManifest:
+    manifest = BuildManifest.load(output_dir, {})
+    for source, output in sources.items():
+        (output_dir / output).parent.mkdir(parents=True, exist_ok=True)
+        (output_dir / output).write_text(source, encoding="utf-8")
+        manifest.record(source, "hash", output, [])
+        manifest.record_output(output, "hash")
+    manifest.save()
+    return manifest
+
+
+def test_removes_outputs_of_deleted_sources(tmp_path: Path) -> None:
+    _build(tmp_path, {"a.rst": "a.html", "sub/b.rst": "sub/b.html"})
+
+    manifest = BuildManifest.load(tmp_path, {})
+    removed = manifest.remove_stale({"a.rst": "a.html"}, tmp_path)
+
+    assert removed == [tmp_path / "sub/b.html"]
+    assert not (tmp_path / "sub/b.html").exists()
+    assert (tmp_path / "a.html").exists()
+    assert list(manifest.pages) == ["a.rst"]
+    assert list(manifest.outputs) == ["a.html"]
+
+
+def test_removes_stale_outputs_after_a_pipeline_change(tmp_path: Path) -> None:
+    _build(tmp_path, {"a.rst": "a.html", "loops.rst": "loops.html"})
+    path = tmp_path / MANIFEST_FILENAME
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["pipeline_hash"] = "changed"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    manifest = BuildManifest.load(tmp_path, {})
+    assert not manifest.pages
+    removed = manifest.remove_stale({"a.rst": "a.html"}, tmp_path)
+
+    assert removed == [tmp_path / "loops.html"]
+    assert not (tmp_path / "loops.html").exists()
+    assert (tmp_path / "a.html").exists()
@@ -0,0 +1,176 @@
+"""OllamaClient against a local stub of Ollama's /api/generate."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from quiz_to_qti import auto_description
+from quiz_to_qti.ollama_client import OllamaClient
+
+
+class StubOllama(ThreadingHTTPServer):
+    """Answers each request with the next scripted (status, delay) reply.
+
+    Once the script runs out every request gets a 200. The client port of
+    each request is recorded, so reused connections show up as equal ports.
+    """
+
+    def __init__(self, script: List[Tuple[int, float]]) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.script = list(script)
+        self.ports: List[int] = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubOllama
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.ports.append(self.client_address[1])
+            n = len(self.server.ports)
+            status, delay = (
+                self.server.script.pop(0) if self.server.script else (200, 0.0)
+            )
+        time.sleep(delay)
+        out = json.dumps({"response": f" Reply {n} from {body['model']}. "}).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+        except OSError:
+            pass  # The client gave up on this attempt
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def stub(request: pytest.FixtureRequest) -> Iterator[StubOllama]:
+    server = StubOllama(getattr(request, "param", []))
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _client(stub: StubOllama, **kwargs: float) -> OllamaClient:
+    options = {"concurrency": 1, "timeout": 5.0, "backoff": 0.01}
+    options.update(kwargs)
+    return OllamaClient(stub.url, **options)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("stub", [[(503, 0.0), (503, 0.0)]], indirect=True)
+def test_retries_unavailable_replies(stub: StubOllama) -> None:
+    client = _client(stub)
+    try:
+        assert client.generate("prompt", model="m") == "Reply 3 from m."
+    finally:
+        client.close()
+    assert len(stub.ports) == 3
+
+
+@pytest.mark.parametrize("stub", [[(503, 0.0)] * 4], indirect=True)
+def test_gives_up_after_the_retries(stub: StubOllama) -> None:
+    client = _client(stub, retries=3)
+    try:
+        assert client.generate("prompt", model="m") is None
+    finally:
+        client.close()
+    assert len(stub.ports) == 4
+
+
+@pytest.mark.parametrize("stub", [[(404, 0.0)]], indirect=True)
+def test_does_not_retry_client_errors(stub: StubOllama) -> None:
+    client = _client(stub)
+    try:
+        assert client.generate("prompt", model="m") is None
+    finally:
+        client.close()
+    assert len(stub.ports) == 1
+
+
+@pytest.mark.parametrize("stub", [[(200, 2.0)]], indirect=True)
+def test_times_out_each_attempt(stub: StubOllama) -> None:
+    client = _client(stub, timeout=0.3)
+    start = time.monotonic()
+    try:
+        assert client.generate("prompt", model="m") == "Reply 2 from m."
+    finally:
+        client.close()
+    # The slow first attempt is abandoned after its own timeout
+    assert time.monotonic() - start < 1.5
+    assert len(stub.ports) == 2
+
+
+def test_reuses_connections(stub: StubOllama) -> None:
+    client = _client(stub, concurrency=2)
+    try:
+        for _ in range(5):
+            assert client.generate("prompt", model="m") is not None
+    finally:
+        client.close()
+    assert len(stub.ports) == 5
+    assert len(set(stub.ports)) == 1
+
+
+@pytest.mark.parametrize("stub", [[(200, 0.1)] * 8], indirect=True)
+def test_shares_a_bounded_pool_between_threads(stub: StubOllama) -> None:
+    client = _client(stub, concurrency=2)
+    replies: List[object] = []
+    threads = [
+        threading.Thread(
+            target=lambda: replies.append(client.generate("prompt", model="m"))
+        )
+        for _ in range(8)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        client.close()
+    assert None not in replies and len(replies) == 8
+    # Two connections carry all eight requests
+    assert len(set(stub.ports)) == 2
+
+
+def test_generate_closes_the_client_it_creates(
+    stub: StubOllama, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    closed: List[OllamaClient] = []
+    close = OllamaClient.close
+
+    def record_close(self: OllamaClient) -> None:
+        closed.append(self)
+        close(self)
+
+    monkeypatch.setattr(OllamaClient, "close", record_close)
+    reply = auto_description._ollama_generate("prompt", base_url=stub.url, model="m")
+    assert reply == "Reply 1 from m."
+    assert len(closed) == 1
+
+    shared = _client(stub)
+    auto_description._ollama_generate("prompt", model="m", client=shared)
+    assert len(closed) == 1
+    shared.close()